@@ -0,0 +1,122 @@
+"""Denormalize organization_id onto CRM, PM, HR and ticket tables
+
+Revision ID: 3b9d52a7e4c1
+Revises: 8f041e6cefd7
+Create Date: 2026-10-18 11:40:07.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '3b9d52a7e4c1'
+down_revision: Union[str, Sequence[str], None] = '8f041e6cefd7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows updated per backfill statement. Each chunk commits on its own, so row
+# locks are held briefly and a failed run can simply be restarted.
+BATCH_SIZE = 5000
+
+# Organization of a data cup, through bowl -> bucket -> department.
+_CUP_ORG = """
+    SELECT departments.organization_id FROM data_cups
+    JOIN data_bowls ON data_bowls.id = data_cups.data_bowl_id
+    JOIN data_buckets ON data_buckets.id = data_bowls.data_bucket_id
+    JOIN departments ON departments.id = data_buckets.department_id
+    WHERE data_cups.id = {table}.data_cup_id
+"""
+
+# (table, ordered sources). The first source that resolves wins, so rows with
+# no owner still pick up their tenant from the data cup or parent record.
+# Order matters: tasks read projects and deals/activities read contacts.
+BACKFILL = [
+    ("contacts", [
+        "SELECT organization_id FROM users WHERE users.id = contacts.owner_id",
+        _CUP_ORG,
+        "SELECT organization_id FROM companies WHERE companies.id = contacts.company_id",
+    ]),
+    ("deals", [
+        "SELECT organization_id FROM users WHERE users.id = deals.owner_id",
+        _CUP_ORG,
+        "SELECT organization_id FROM contacts WHERE contacts.id = deals.contact_id",
+    ]),
+    ("crm_tasks", [
+        "SELECT organization_id FROM users WHERE users.id = crm_tasks.owner_id",
+        "SELECT organization_id FROM contacts WHERE contacts.id = crm_tasks.contact_id",
+    ]),
+    ("activities", [
+        "SELECT organization_id FROM users WHERE users.id = activities.user_id",
+        "SELECT organization_id FROM contacts WHERE contacts.id = activities.contact_id",
+    ]),
+    ("projects", [
+        "SELECT organization_id FROM users WHERE users.id = projects.manager_id",
+        _CUP_ORG,
+    ]),
+    ("tasks", [
+        "SELECT organization_id FROM projects WHERE projects.id = tasks.project_id",
+        "SELECT organization_id FROM users WHERE users.id = tasks.assignee_id",
+    ]),
+    ("time_off_requests", [
+        "SELECT organization_id FROM users WHERE users.id = time_off_requests.user_id",
+    ]),
+    ("tickets", [
+        "SELECT organization_id FROM users WHERE users.id = tickets.submitted_by",
+    ]),
+]
+
+INDEXES = [(f"ix_{table}_organization_id_id", table, ["organization_id", "id"]) for table, _ in BACKFILL]
+
+
+def _backfill_statement(table, sources):
+    subqueries = ", ".join(f"({source.format(table=table).strip()})" for source in sources)
+    return (
+        f"UPDATE {table} SET organization_id = COALESCE({subqueries}) "
+        f"WHERE {table}.organization_id IS NULL"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable with no default: a catalog-only change, no table rewrite.
+    for table, _ in BACKFILL:
+        op.add_column(table, sa.Column('organization_id', sa.Integer(), nullable=True))
+        op.create_foreign_key(
+            f'{table}_organization_id_fkey', table, 'organizations', ['organization_id'], ['id'],
+            postgresql_not_valid=True,
+        )
+
+    context = op.get_context()
+    with context.autocommit_block():
+        for table, sources in BACKFILL:
+            statement = _backfill_statement(table, sources)
+            if context.as_sql:
+                op.execute(statement)
+                continue
+            bind = op.get_bind()
+            low, high = bind.execute(sa.text(f"SELECT min(id), max(id) FROM {table}")).one()
+            if low is None:
+                continue
+            for start in range(low, high + 1, BATCH_SIZE):
+                bind.execute(
+                    sa.text(f"{statement} AND {table}.id >= :start AND {table}.id < :stop"),
+                    {"start": start, "stop": start + BATCH_SIZE},
+                )
+
+        for table, _ in BACKFILL:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_organization_id_fkey")
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    for table, _ in reversed(BACKFILL):
+        op.drop_constraint(f'{table}_organization_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'organization_id')
@@ -0,0 +1,34 @@
+"""Add per-organization collection versions for conditional GETs
+
+Revision ID: 5e1f0c9a2d47
+Revises: 3b9d52a7e4c1
+Create Date: 2026-10-18 14:02:51.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '5e1f0c9a2d47'
+down_revision: Union[str, Sequence[str], None] = '3b9d52a7e4c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'collection_versions',
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('collection', sa.String(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id']),
+        sa.PrimaryKeyConstraint('organization_id', 'collection'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('collection_versions')
@@ -0,0 +1,69 @@
+"""Add deal_summaries for pipeline analytics
+
+Revision ID: 7b2f6d0c8a31
+Revises: d93b0a7f5c28
+Create Date: 2026-10-18 18:21:40.562093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '7b2f6d0c8a31'
+down_revision: Union[str, Sequence[str], None] = 'd93b0a7f5c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# One summary row set per dimension (owner, company and each close-date
+# bucket); each deal is counted once in each.
+BACKFILL = """
+    INSERT INTO deal_summaries (organization_id, dimension, stage, owner_id, company_id, close_date, deal_count, total_value)
+    SELECT organization_id, 'owner', stage, owner_id, NULL::integer, NULL::date, count(*), coalesce(sum(value), 0)
+    FROM deals WHERE organization_id IS NOT NULL
+    GROUP BY organization_id, stage, owner_id
+    UNION ALL
+    SELECT organization_id, 'company', stage, NULL::uuid, company_id, NULL::date, count(*), coalesce(sum(value), 0)
+    FROM deals WHERE organization_id IS NOT NULL
+    GROUP BY organization_id, stage, company_id
+    UNION ALL
+    SELECT d.organization_id, b.bucket, d.stage, NULL::uuid, NULL::integer,
+           date_trunc(b.bucket, d.close_date::timestamp)::date AS period, count(*), coalesce(sum(d.value), 0)
+    FROM deals d CROSS JOIN (VALUES ('week'), ('month'), ('quarter')) AS b (bucket)
+    WHERE d.organization_id IS NOT NULL
+    GROUP BY d.organization_id, b.bucket, d.stage, period
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'deal_summaries',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('dimension', sa.String(), nullable=False),
+        sa.Column('stage', postgresql.ENUM('NEW_LEAD', 'PROPOSAL_SENT', 'NEGOTIATION', 'WON', 'LOST', name='dealstage', create_type=False), nullable=True),
+        sa.Column('owner_id', sa.UUID(), nullable=True),
+        sa.Column('company_id', sa.Integer(), nullable=True),
+        sa.Column('close_date', sa.Date(), nullable=True),
+        sa.Column('deal_count', sa.Integer(), nullable=False),
+        sa.Column('total_value', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id']),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id'),
+        # NULLS NOT DISTINCT needs Postgres 15+.
+        sa.UniqueConstraint(
+            'organization_id', 'dimension', 'stage', 'owner_id', 'company_id', 'close_date',
+            name='uq_deal_summaries_group', postgresql_nulls_not_distinct=True,
+        ),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('deal_summaries')
@@ -0,0 +1,65 @@
+"""Add indexes for org-scoped list queries
+
+Revision ID: 8f041e6cefd7
+Revises: c8b20fe38c6d
+Create Date: 2026-10-18 09:12:41.513207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '8f041e6cefd7'
+down_revision: Union[str, Sequence[str], None] = 'c8b20fe38c6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns). Composite indexes lead with the filter column
+# and end with the primary key so org/owner-scoped pages are index range scans
+# in key order. Also imported by benchmarks/list_query_plans.py.
+INDEXES = [
+    ("ix_users_organization_id_id", "users", ["organization_id", "id"]),
+    ("ix_departments_organization_id", "departments", ["organization_id"]),
+    ("ix_teams_department_id", "teams", ["department_id"]),
+    ("ix_data_bowls_team_id", "data_bowls", ["team_id"]),
+    ("ix_team_roles_user_id", "team_roles", ["user_id"]),
+    ("ix_team_roles_team_id", "team_roles", ["team_id"]),
+    ("ix_data_cups_data_bowl_id", "data_cups", ["data_bowl_id"]),
+    ("ix_data_cups_team_role_id", "data_cups", ["team_role_id"]),
+    ("ix_contacts_owner_id_id", "contacts", ["owner_id", "id"]),
+    ("ix_contacts_data_cup_id", "contacts", ["data_cup_id"]),
+    ("ix_deals_owner_id_id", "deals", ["owner_id", "id"]),
+    ("ix_deals_data_cup_id", "deals", ["data_cup_id"]),
+    ("ix_crm_tasks_owner_id_id", "crm_tasks", ["owner_id", "id"]),
+    ("ix_activities_user_id_id", "activities", ["user_id", "id"]),
+    ("ix_projects_manager_id_id", "projects", ["manager_id", "id"]),
+    ("ix_projects_data_cup_id", "projects", ["data_cup_id"]),
+    ("ix_tasks_assignee_id_id", "tasks", ["assignee_id", "id"]),
+    ("ix_tasks_project_id", "tasks", ["project_id"]),
+    ("ix_time_off_requests_user_id_id", "time_off_requests", ["user_id", "id"]),
+    ("ix_tickets_team_id_id", "tickets", ["team_id", "id"]),
+    ("ix_tickets_submitted_by_id", "tickets", ["submitted_by", "id"]),
+    ("ix_docs_organization_id_id", "docs", ["organization_id", "id"]),
+    ("ix_docs_parent_id", "docs", ["parent_id"]),
+    ("ix_docs_data_cup_id", "docs", ["data_cup_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and builds
+    # without blocking writes, so this is safe to run against a live database.
+    # A build that fails leaves an INVALID index behind; drop it before re-running.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,46 @@
+"""Add user import jobs
+
+Revision ID: a4c7e2d91b3f
+Revises: 5e1f0c9a2d47
+Create Date: 2026-10-18 15:21:37.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a4c7e2d91b3f'
+down_revision: Union[str, Sequence[str], None] = '5e1f0c9a2d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_import_jobs',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=True),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='importstatus'), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('processed', sa.Integer(), nullable=True),
+        sa.Column('created', sa.Integer(), nullable=True),
+        sa.Column('failed', sa.Integer(), nullable=True),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_user_import_jobs_organization_id'), 'user_import_jobs', ['organization_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_import_jobs_organization_id'), table_name='user_import_jobs')
+    op.drop_table('user_import_jobs')
+    op.execute('DROP TYPE IF EXISTS importstatus')
@@ -0,0 +1,40 @@
+"""Add case-insensitive indexes used to dedup CRM imports
+
+Revision ID: d93b0a7f5c28
+Revises: a4c7e2d91b3f
+Create Date: 2026-10-18 16:48:02.117390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd93b0a7f5c28'
+down_revision: Union[str, Sequence[str], None] = 'a4c7e2d91b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, expressions). CSV imports match contacts by lowercase
+# email within an organization and link them to companies by lowercase domain.
+INDEXES = [
+    ("ix_contacts_organization_id_lower_email", "contacts", ["organization_id", sa.text("lower(email)")]),
+    ("ix_companies_lower_domain", "companies", [sa.text("lower(domain)")]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently, outside a transaction, so imports and writes keep running.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -8,6 +8,7 @@ from ..auth.endpoints import router as auth_router
 from ..requests.endpoints import router as requests_router
 from ..organizations.endpoints import router as organizations_router
 from ..teams.endpoints import router as teams_router
+from ..monitoring.endpoints import router as monitoring_router
 
 api_router = APIRouter()
 
@@ -25,4 +26,7 @@ api_router.include_router(crm_router, prefix="/crm", tags=["CRM"])
 api_router.include_router(pm_router, prefix="/pm", tags=["Project Management"])
 api_router.include_router(hr_router, prefix="/hr", tags=["Human Resources"])
 api_router.include_router(docs_router, prefix="/docs", tags=["Documents"])
-api_router.include_router(requests_router, prefix="/requests", tags=["Requests"])
\ No newline at end of file
+api_router.include_router(requests_router, prefix="/requests", tags=["Requests"])
+
+# --- Operational Routers ---
+api_router.include_router(monitoring_router, prefix="/monitoring", tags=["Monitoring"])
@@ -1,36 +1,57 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta
 
 from .. import users
-from . import schemas, security
+from . import schemas, security, hashing
 from ..db.session import get_db
-from ..core.config import settings
 
 router = APIRouter()
 
 @router.post("/login", response_model=schemas.Token)
-def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
     """
     Authenticate a user and return an access token.
+    Password verification runs on the dedicated hashing pool, so a burst of
+    logins cannot starve the threadpool serving other endpoints.
     """
     # 1. Find the user by email (username)
-    user = users.crud.get_user_by_email(db, email=form_data.username)
-    
+    user = await run_in_threadpool(users.crud.get_user_by_email, db, email=form_data.username)
+
     # 2. Check if the user exists and the password is correct
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await hashing.verify_and_update(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    # 3. Create the access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    
-    # 4. Return the token
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+
+    # 3. Create the access and refresh tokens
+    tokens = security.create_user_tokens(user)
+
+    # 4. Transparently upgrade hashes made with outdated pwd_context parameters
+    if new_hash:
+        await run_in_threadpool(users.crud.set_password_hash, db, user, new_hash)
+
+    # 5. Return the tokens
+    return tokens
+
+@router.post("/refresh", response_model=schemas.Token)
+def refresh_access_token(body: schemas.RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new token pair.
+    The user is reloaded so the new access token carries current claims.
+    """
+    payload = security.decode_token(body.refresh_token, token_type="refresh")
+    user = users.crud.get_user_by_email(db, email=payload["sub"])
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return security.create_user_tokens(user)
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from ..core.config import settings
+from .security import pwd_context
+
+# --- Password Hashing Pool ---
+# Argon2 is deliberately slow. Running it on Starlette's shared threadpool lets
+# a burst of logins starve every other sync endpoint, so hashing gets its own
+# small pool instead. argon2-cffi releases the GIL while hashing, so threads
+# give real parallelism here without the cost of a process pool.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _admit():
+    """
+    Reserve a slot in the hashing queue, or fail fast with a 503 when full.
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _pending += 1
+
+
+def _release(_future=None):
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+async def _run(fn, *args):
+    _admit()
+    try:
+        future = _executor.submit(fn, *args)
+    except BaseException:
+        _release()
+        raise
+    # Release on completion rather than on await, so a cancelled request
+    # still counts against the queue until its hash actually finishes.
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+async def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing pool.
+    Returns (is_valid, new_hash); new_hash is set when the stored hash was made
+    with deprecated parameters and should be replaced.
+    """
+    return await _run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hash a password on the hashing pool.
+    """
+    return await _run(pwd_context.hash, password)
+
+
+# Bulk imports get a separate pool: a few thousand hashes would otherwise
+# fill the login queue above and turn every login into a 503.
+_bulk_executor = ThreadPoolExecutor(
+    max_workers=settings.USER_IMPORT_HASH_WORKERS,
+    thread_name_prefix="password-hash-bulk",
+)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hash many passwords in parallel on the bulk pool, in order. Blocks, so
+    call it from a worker thread (e.g. a background job), not the event loop.
+    """
+    return list(_bulk_executor.map(pwd_context.hash, passwords))
+
+
+def pending() -> int:
+    """
+    Number of hashing jobs currently queued or running.
+    """
+    return _pending
@@ -0,0 +1,61 @@
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core.cache import TTLCache
+from ..core.config import settings
+
+# --- Authenticated Principal Cache ---
+# Maps a token subject (email) to a detached User snapshot so get_current_user
+# can skip the users/organizations lookup on every request. Entries never
+# outlive the token that produced them nor PRINCIPAL_CACHE_TTL_SECONDS, which
+# also bounds staleness in other workers after an invalidation.
+_principals = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def get_cached_user(db: Session, email: str) -> Optional[models.User]:
+    """
+    Return a session-bound copy of the cached user for this subject, if any.
+    """
+    cached = _principals.get(email)
+    if cached is None:
+        return None
+    # load=False attaches a copy to this session without emitting any SQL.
+    return db.merge(cached, load=False)
+
+
+def cache_user(db: Session, user: models.User, expires_at: Optional[float] = None) -> models.User:
+    """
+    Cache a freshly loaded user and return a session-bound copy of it.
+    `expires_at` is the token's `exp` claim (seconds since the epoch).
+    """
+    ttl = None
+    if expires_at is not None:
+        ttl = expires_at - time.time()
+    # Detach the loaded instances so the cached snapshot is never shared
+    # with (or expired by) the session that loaded it.
+    if user.organization is not None:
+        db.expunge(user.organization)
+    db.expunge(user)
+    _principals.set(user.email, user, ttl=ttl)
+    return db.merge(user, load=False)
+
+
+def invalidate_user(email: Optional[str]) -> None:
+    if email:
+        _principals.delete(email)
+
+
+def invalidate_organization(org_id: int) -> None:
+    _principals.delete_where(lambda email, user: user.organization_id == org_id)
+
+
+@event.listens_for(models.User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    invalidate_user(target.email)
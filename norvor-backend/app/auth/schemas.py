@@ -1,11 +1,24 @@
 from pydantic import BaseModel
 from typing import Optional
+from uuid import UUID
+from ..models import UserRole
 
 # --- Schema for the data we send back to the user ---
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 # --- Schema for the data encoded inside the JWT ---
 class TokenData(BaseModel):
-    email: Optional[str] = None
\ No newline at end of file
+    email: Optional[str] = None
+
+# --- Schema for the caller as described by the access token's claims ---
+class Principal(BaseModel):
+    id: UUID
+    email: str
+    organization_id: int
+    role: Optional[UserRole] = None
@@ -10,7 +10,7 @@ from pydantic import ValidationError
 from ..core.config import settings
 from .. import users
 from ..db.session import get_db # Correctly import get_db
-from . import schemas
+from . import schemas, principals
 
 
 # --- Password Hashing ---
@@ -44,6 +44,46 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_user_tokens(user) -> dict:
+    """
+    Issue a short-lived access token carrying the user's id, organization and
+    role as signed claims, plus a long-lived refresh token that only names the
+    subject. Claims are re-read from the database on every refresh.
+    """
+    access_token = create_access_token(
+        data={
+            "sub": user.email,
+            "type": "access",
+            "uid": str(user.id),
+            "org": user.organization_id,
+            "role": user.role.value if user.role else None,
+        },
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    refresh_token = create_access_token(
+        data={"sub": user.email, "type": "refresh"},
+        expires_delta=timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+    )
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+def decode_token(token: str, token_type: str = "access") -> dict:
+    """
+    Decode and validate a JWT, raising 401 if it is invalid or of the wrong type.
+    Tokens issued before typed tokens existed are treated as access tokens.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    if payload.get("sub") is None or payload.get("type", "access") != token_type:
+        raise credentials_exception
+    return payload
+
 #
 # THIS IS THE CORRECTED FUNCTION
 #
@@ -51,22 +91,48 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     """
     Decode the JWT token to get the current user.
     This is a dependency that other endpoints can use.
+    Users are served from the principal cache when possible, so most
+    requests do not touch the database here.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    payload = decode_token(token)
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(email=email)
-    except (JWTError, ValidationError):
+        token_data = schemas.TokenData(email=payload.get("sub"))
+    except ValidationError:
         raise credentials_exception
     
+    user = principals.get_cached_user(db, email=token_data.email)
+    if user is not None:
+        return user
+
     user = users.crud.get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    return principals.cache_user(db, user, expires_at=payload.get("exp"))
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> schemas.Principal:
+    """
+    Resolve the caller from the signed claims in the access token alone.
+    Use this for endpoints that only need the user's id, organization and
+    role: it does no database work. Claims are as fresh as the token, so
+    endpoints that need the live user record should use get_current_user.
+    """
+    payload = decode_token(token)
+    try:
+        return schemas.Principal(
+            id=payload.get("uid"),
+            email=payload.get("sub"),
+            organization_id=payload.get("org"),
+            role=payload.get("role"),
+        )
+    except ValidationError:
+        # Tokens issued before claims were embedded must be refreshed.
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
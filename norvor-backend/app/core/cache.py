@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from .config import settings
+
+
+class TTLCache:
+    """
+    A small, thread-safe LRU cache where every entry carries its own expiry.
+    Used for in-process caches that must stay bounded in size and staleness.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        """
+        Drop every entry for which predicate(key, value) is true.
+        """
+        with self._lock:
+            for key in [k for k, (_, v) in self._data.items() if predicate(k, v)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# --- Tenant-Scoped Response Cache ---
+# Serialized (JSON bytes) responses for hot, rarely-changing reads, keyed by
+# organization and route parameters. Each organization has a generation
+# counter that is part of every key; a write bumps it after committing, which
+# orphans all of that tenant's entries at once (they age out via TTL/LRU).
+# Readers fetch the generation *before* querying, so a read that raced a write
+# can only ever store its result under the old, already-abandoned generation.
+# With the local backend generations are per worker, so callers also put the
+# tenant's collection version (db/versions.py) in `params`: that version lives
+# in the database, and every worker moves to a new key as soon as it changes.
+
+class CacheStats:
+    """
+    Per-process hit/miss counters, per namespace.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: dict = {}
+
+    def increment(self, namespace: str, counter: str):
+        with self._lock:
+            entry = self._counts.setdefault(namespace, {"hits": 0, "misses": 0, "errors": 0})
+            entry[counter] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = {namespace: dict(entry) for namespace, entry in sorted(self._counts.items())}
+        for entry in counts.values():
+            lookups = entry["hits"] + entry["misses"]
+            entry["hit_rate"] = round(entry["hits"] / lookups, 4) if lookups else None
+        return counts
+
+
+class LocalCache:
+    """
+    In-process backend: an LRU of entries plus a plain dict of generations.
+    Generations are per worker, so other workers only see an invalidation
+    once their own entries expire (bounded by the TTL).
+    """
+
+    name = "local"
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value, ttl=ttl)
+
+    def generation(self, key: str) -> int:
+        return self._generations.get(key, 0)
+
+    def bump(self, key: str) -> None:
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        with self._lock:
+            self._generations.clear()
+
+
+class RedisCache:
+    """
+    Shared backend for anything speaking the Redis protocol (Redis, Valkey,
+    KeyDB, a local stand-in). Requires the `redis` package. Generations are
+    shared, so an invalidation is seen by every worker immediately.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("RESPONSE_CACHE_URL is set but the redis package is not installed") from exc
+        self._client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    def generation(self, key: str) -> int:
+        return int(self._client.get(key) or 0)
+
+    def bump(self, key: str) -> None:
+        self._client.incr(key)
+
+    def clear(self) -> None:
+        self._client.flushdb()
+
+
+class TenantCache:
+    """
+    Get-or-load cache of JSON bytes scoped to an organization. Backend
+    failures are counted and treated as misses: the cache never fails a read.
+    """
+
+    def __init__(self, backend, ttl: float, prefix: str = "norvor"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    def _generation_key(self, organization_id: int) -> str:
+        return f"{self.prefix}:gen:{organization_id}"
+
+    def get_or_load(self, namespace: str, organization_id: int, params: tuple, loader: Callable[[], bytes]) -> bytes:
+        try:
+            generation = self.backend.generation(self._generation_key(organization_id))
+            key = f"{self.prefix}:{namespace}:{organization_id}:{generation}:" + ":".join(map(str, params))
+            value = self.backend.get(key)
+        except Exception:
+            self.stats.increment(namespace, "errors")
+            return loader()
+        if value is not None:
+            self.stats.increment(namespace, "hits")
+            return value
+        self.stats.increment(namespace, "misses")
+        value = loader()
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception:
+            self.stats.increment(namespace, "errors")
+        return value
+
+    def invalidate(self, organization_id: Optional[int]) -> None:
+        """
+        Drop every cached response of the organization. Call after commit.
+        """
+        if organization_id is None:
+            return
+        try:
+            self.backend.bump(self._generation_key(organization_id))
+        except Exception:
+            self.stats.increment("invalidate", "errors")
+
+    def snapshot(self) -> dict:
+        return {"backend": self.backend.name, "ttl_seconds": self.ttl, "namespaces": self.stats.snapshot()}
+
+
+def _response_cache_backend():
+    if settings.RESPONSE_CACHE_URL:
+        return RedisCache(settings.RESPONSE_CACHE_URL)
+    return LocalCache(maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = TenantCache(_response_cache_backend(), ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
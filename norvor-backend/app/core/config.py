@@ -3,12 +3,109 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _async_database_url(url):
+    """
+    Derive the asyncpg URL from a sync Postgres URL (e.g. postgresql+psycopg2://...).
+    """
+    if not url:
+        return url
+    scheme, _, rest = url.partition("://")
+    if scheme.split("+")[0] in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+
+    # --- Read Replica Settings (optional; reads use the primary when unset) ---
+    DATABASE_READ_URL: str = os.getenv("DATABASE_READ_URL")
+    ASYNC_DATABASE_READ_URL: str = os.getenv("ASYNC_DATABASE_READ_URL") or _async_database_url(DATABASE_READ_URL)
+    READ_AFTER_WRITE_WINDOW_SECONDS: int = int(os.getenv("READ_AFTER_WRITE_WINDOW_SECONDS", 5))
+
+    # --- Connection Pool Settings (applied to each engine, per worker) ---
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+    # --- Startup Settings ---
+    # STARTUP_MODE: "verify" checks the Alembic revision and that every model
+    # table and column exists, "create_all" creates missing tables, "skip"
+    # does neither. The baseline revision is empty, so `alembic upgrade head`
+    # cannot build an empty database. Bootstrap a new one by starting once
+    # with STARTUP_MODE=create_all (or running create_tables.py), then
+    # `alembic stamp head` against it; later releases use `alembic upgrade
+    # head` and the default "verify".
+    STARTUP_MODE: str = os.getenv("STARTUP_MODE", "verify")
+    STARTUP_STRICT: bool = os.getenv("STARTUP_STRICT", "false").lower() in ("1", "true", "yes")
+    DB_POOL_WARM: int = int(os.getenv("DB_POOL_WARM", 2))
+
+    # --- Query Profiling Settings ---
+    QUERY_PROFILING: bool = os.getenv("QUERY_PROFILING", "true").lower() in ("1", "true", "yes")
+    QUERY_BUDGET: int = int(os.getenv("QUERY_BUDGET", 20))
+    QUERY_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", 5))
+
+    # --- Monitoring Settings ---
+    # Comma-separated emails of the operators allowed to read /monitoring/*
+    # (process-wide pool, query, startup and cache internals). Empty: nobody.
+    MONITORING_ALLOWED_EMAILS: frozenset = frozenset(
+        email.strip().lower() for email in os.getenv("MONITORING_ALLOWED_EMAILS", "").split(",") if email.strip()
+    )
+
+    # --- List Count Settings ---
+    # Totals up to EXACT_COUNT_THRESHOLD rows are counted exactly; larger ones
+    # come from the planner's estimate and are cached per organization.
+    EXACT_COUNT_THRESHOLD: int = int(os.getenv("EXACT_COUNT_THRESHOLD", 10000))
+    COUNT_CACHE_TTL_SECONDS: int = int(os.getenv("COUNT_CACHE_TTL_SECONDS", 300))
+
+    # --- Export Settings ---
+    # Rows fetched per round-trip from the server-side cursor behind exports.
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+    # --- Response Cache Settings ---
+    # Hierarchy and organization reads are cached per tenant. Set
+    # RESPONSE_CACHE_URL (redis://...) to share the cache across workers;
+    # otherwise each worker keeps its own RESPONSE_CACHE_SIZE-entry LRU.
+    RESPONSE_CACHE_URL: str = os.getenv("RESPONSE_CACHE_URL")
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", 2048))
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 300))
+
+    # --- CSV Import Settings ---
+    # Rows parsed per hop off the event loop while streaming an upload into COPY.
+    CSV_IMPORT_BATCH_SIZE: int = int(os.getenv("CSV_IMPORT_BATCH_SIZE", 5000))
+    # Rejected rows listed in an import's response (all of them are counted).
+    CSV_IMPORT_MAX_ERRORS: int = int(os.getenv("CSV_IMPORT_MAX_ERRORS", 1000))
 
     # --- JWT Settings ---
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 60 * 24 * 7))
+
+    # --- Principal Cache Settings ---
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+
+    # --- Access Map Cache Settings ---
+    # Entries are rebuilt as soon as the HIERARCHY version moves; the TTL only
+    # evicts maps of users who stopped making requests.
+    ACCESS_MAP_CACHE_SIZE: int = int(os.getenv("ACCESS_MAP_CACHE_SIZE", 10000))
+    ACCESS_MAP_CACHE_TTL_SECONDS: int = int(os.getenv("ACCESS_MAP_CACHE_TTL_SECONDS", 60))
+
+    # --- Password Hashing Pool Settings ---
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+
+    # --- Signup Settings ---
+    # Name of the provisioning template (organizations/provisioning.py) new tenants start from.
+    SIGNUP_TEMPLATE: str = os.getenv("SIGNUP_TEMPLATE", "default")
+
+    # --- Bulk User Import Settings ---
+    # Imports hash on their own pool so they never queue behind (or block) logins.
+    USER_IMPORT_HASH_WORKERS: int = int(os.getenv("USER_IMPORT_HASH_WORKERS", os.cpu_count() or 1))
+    USER_IMPORT_BATCH_SIZE: int = int(os.getenv("USER_IMPORT_BATCH_SIZE", 500))
+    USER_IMPORT_MAX_ROWS: int = int(os.getenv("USER_IMPORT_MAX_ROWS", 20000))
 
 settings = Settings()
\ No newline at end of file
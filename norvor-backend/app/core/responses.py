@@ -0,0 +1,37 @@
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+
+def json_bytes(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for payloads that are already plain dicts and lists (e.g.
+    Core rows), encoded with orjson. UUIDs, dates, datetimes and enums are
+    handled natively, so no Pydantic model or jsonable_encoder pass is needed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
+
+
+def json_body_response(body: bytes, response: Response) -> Response:
+    """
+    Send already-encoded JSON (e.g. from the response cache), keeping headers
+    already set on the endpoint's `response` (ETag, cursor, totals).
+    """
+    headers = {key: value for key, value in response.headers.items() if key not in ("content-length", "content-type")}
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from .config import settings
+from ..db.base_class import Base
+from ..db.session import engine, async_engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Phase name -> duration in milliseconds, for logs and the monitoring endpoint.
+startup_timings = {}
+
+
+@contextmanager
+def phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def expected_revision():
+    """
+    The Alembic head revision this build of the code expects the database to be at.
+    """
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_current_head()
+
+
+def schema_drift(columns_by_table: dict) -> list:
+    """
+    Tables and columns the models declare but the database lacks, given the
+    database's {table: {column, ...}}. Extra tables and columns are allowed.
+    """
+    problems = []
+    for name, table in sorted(Base.metadata.tables.items()):
+        existing = columns_by_table.get(name)
+        if existing is None:
+            problems.append(f"missing table {name}")
+            continue
+        missing = sorted(column.name for column in table.columns if column.name not in existing)
+        if missing:
+            problems.append(f"{name} is missing columns {', '.join(missing)}")
+    return problems
+
+
+async def verify_schema():
+    """
+    Check the database against this build: its Alembic revision against the
+    shipped head, and its actual tables and columns (one information_schema
+    query) against the models, which also catches drift from create_all or
+    manual DDL that left the revision untouched. Does no DDL.
+    """
+    head = await run_in_threadpool(expected_revision)
+    async with async_engine.connect() as connection:
+        current = (await connection.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+        rows = (await connection.execute(text(
+            "SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = current_schema()"
+        ))).all()
+    columns_by_table = {}
+    for table_name, column_name in rows:
+        columns_by_table.setdefault(table_name, set()).add(column_name)
+
+    problems = schema_drift(columns_by_table)
+    if current != head:
+        problems.insert(0, f"revision is {current}, but this build expects {head}")
+    if problems:
+        message = "Database schema does not match this build: " + "; ".join(problems)
+        if settings.STARTUP_STRICT:
+            raise RuntimeError(message)
+        logger.warning(message)
+
+
+async def warm_pools(count: int):
+    """
+    Open `count` connections on each primary pool so first requests skip the handshake.
+    """
+    if count <= 0:
+        return
+    connections = await asyncio.gather(*(async_engine.connect().start() for _ in range(count)))
+    for connection in connections:
+        await connection.close()
+
+    def _warm_sync():
+        connections = [engine.connect() for _ in range(count)]
+        for connection in connections:
+            connection.close()
+
+    await run_in_threadpool(_warm_sync)
+
+
+async def run_startup(app):
+    """
+    Prepare a worker to serve: schema check (or create_all, which also
+    bootstraps a new database; see STARTUP_MODE), pool warm-up and OpenAPI
+    generation, each timed. Database problems are logged rather than fatal
+    unless STARTUP_STRICT is set, so a briefly unreachable database does not
+    fail a rolling deploy.
+    """
+    started = time.perf_counter()
+    mode = settings.STARTUP_MODE
+    try:
+        if mode == "create_all":
+            with phase("create_all"):
+                await run_in_threadpool(Base.metadata.create_all, bind=engine)
+        elif mode == "verify":
+            with phase("verify_schema"):
+                await verify_schema()
+        with phase("warm_pools"):
+            await warm_pools(min(settings.DB_POOL_WARM, settings.DB_POOL_SIZE))
+    except Exception as exc:
+        if settings.STARTUP_STRICT:
+            raise
+        logger.warning("Database startup checks failed, continuing: %s", exc)
+
+    with phase("openapi"):
+        app.openapi()
+
+    startup_timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info("Worker ready (mode=%s): %s", mode, startup_timings)
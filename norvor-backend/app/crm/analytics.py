@@ -0,0 +1,191 @@
+import datetime
+from typing import Iterable, Mapping, Optional, get_args
+
+from sqlalchemy import case, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import schemas
+from .. import models
+
+# --- Deal Pipeline Analytics ---
+# deal_summaries holds, per organization and stage, one row per owner, one per
+# company and one per close week, month and quarter, each with the number and
+# total value of the deals in it. A deal is counted once in each of those
+# dimensions, so the table is bounded by owners + companies + close-date
+# buckets (times five stages) however many deals there are. Every deal write
+# passes the rows it removed and added to `apply_deal_changes`, which folds
+# them into signed deltas and applies those with one INSERT ... ON CONFLICT
+# DO UPDATE in the same transaction. Analytics then run one GROUPING SETS
+# query over the owner, company and requested bucket rows; close dates are
+# truncated on write, so reads need no date_trunc. Weighted value is computed
+# at read time from the stage, so changing STAGE_WEIGHTS needs no backfill.
+
+# Deal fields the summaries depend on (besides `value`).
+SUMMARY_KEYS = ("stage", "owner_id", "company_id", "close_date")
+
+# Summary dimension -> the deal field it groups by. Stage breakdowns and
+# totals are read from the owner rows (any dimension would do). Each
+# AnalyticsBucket is a dimension too, grouping by the truncated close_date.
+DIMENSIONS = {"owner": "owner_id", "company": "company_id"}
+BUCKETS = get_args(schemas.AnalyticsBucket)
+
+# Win probability per stage.
+STAGE_WEIGHTS = {
+    models.DealStage.NEW_LEAD: 0.1,
+    models.DealStage.PROPOSAL_SENT: 0.4,
+    models.DealStage.NEGOTIATION: 0.7,
+    models.DealStage.WON: 1.0,
+    models.DealStage.LOST: 0.0,
+}
+
+
+def deal_values(deal: models.Deal) -> dict:
+    """
+    The summary fields of a loaded deal, captured before it is changed or deleted.
+    """
+    return {name: getattr(deal, name) for name in (*SUMMARY_KEYS, "value")}
+
+
+def bucket_start(close_date: Optional[datetime.date], bucket: schemas.AnalyticsBucket) -> Optional[datetime.date]:
+    """
+    First day of the week (Monday), month or quarter `close_date` falls in,
+    matching Postgres date_trunc.
+    """
+    if close_date is None:
+        return None
+    if bucket == "week":
+        return close_date - datetime.timedelta(days=close_date.weekday())
+    if bucket == "month":
+        return close_date.replace(day=1)
+    return close_date.replace(month=close_date.month - (close_date.month - 1) % 3, day=1)
+
+
+def _keys(row: Mapping):
+    stage = row.get("stage")
+    stage = models.DealStage(stage) if stage is not None else None
+    for dimension, field in DIMENSIONS.items():
+        yield dimension, stage, field, row.get(field)
+    for bucket in BUCKETS:
+        yield bucket, stage, "close_date", bucket_start(row.get("close_date"), bucket)
+
+
+async def apply_deal_changes(db: AsyncSession, organization_id: int, removed: Iterable[Mapping] = (), added: Iterable[Mapping] = ()) -> None:
+    """
+    Move deals out of (`removed`) and into (`added`) their summary rows. Each
+    row is a mapping with the SUMMARY_KEYS and `value`; an update passes the
+    deal's values before and after. Does not commit.
+    """
+    deltas = {}
+    for sign, rows in ((-1, removed), (1, added)):
+        for row in rows:
+            for key in _keys(row):
+                count, value = deltas.get(key, (0, 0.0))
+                deltas[key] = (count + sign, value + sign * (row.get("value") or 0))
+    rows = [
+        {
+            "organization_id": organization_id, "dimension": dimension, "stage": stage,
+            "owner_id": None, "company_id": None, "close_date": None, field: member,
+            "deal_count": count, "total_value": value,
+        }
+        for (dimension, stage, field, member), (count, value) in deltas.items()
+        if count or value
+    ]
+    if not rows:
+        return
+    # A stable order keeps concurrent writers from deadlocking on each other's groups.
+    rows.sort(key=lambda row: tuple(str(row[name]) for name in ("dimension", *SUMMARY_KEYS)))
+    statement = insert(models.DealSummary).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        constraint="uq_deal_summaries_group",
+        set_={
+            "deal_count": models.DealSummary.deal_count + statement.excluded.deal_count,
+            "total_value": models.DealSummary.total_value + statement.excluded.total_value,
+        },
+    ))
+    if any(row["deal_count"] < 0 for row in rows):
+        await db.execute(delete(models.DealSummary).where(
+            models.DealSummary.organization_id == organization_id, models.DealSummary.deal_count <= 0
+        ))
+
+
+def _aggregate(row) -> dict:
+    return {
+        "deal_count": row.deal_count or 0,
+        "total_value": row.total_value or 0.0,
+        "weighted_value": row.weighted_value or 0.0,
+    }
+
+
+def analytics_query(source, organization_id: int, bucket: schemas.AnalyticsBucket):
+    """
+    The GROUPING SETS select over `source`: deal_summaries, or any selectable
+    with its columns.
+    """
+    c = source.c
+    weight = case(*((c.stage == stage, weight) for stage, weight in STAGE_WEIGHTS.items()), else_=0.0)
+    # Only one of owner_id, company_id and close_date is set on a row, so one
+    # grouping set yields every dimension's members.
+    members = (c.dimension, c.owner_id, c.company_id, c.close_date)
+    return (
+        select(
+            c.dimension,
+            c.stage,
+            c.owner_id,
+            c.company_id,
+            c.close_date.label("period"),
+            func.grouping(c.stage, c.owner_id).label("grouping_id"),
+            func.sum(c.deal_count).label("deal_count"),
+            func.sum(c.total_value).label("total_value"),
+            func.sum(c.total_value * weight).label("weighted_value"),
+        )
+        .where(c.organization_id == organization_id, c.dimension.in_([*DIMENSIONS, bucket]))
+        .group_by(func.grouping_sets(tuple_(c.dimension, c.stage), tuple_(*members), tuple_(c.dimension)))
+    )
+
+
+# (grouping() bits, dimension) -> section. grouping(stage, owner_id) sets the
+# high bit when the row is not grouped by stage and the low bit when it is not
+# grouped by its members ("period" is the requested bucket); stage breakdowns
+# and totals of the other dimensions repeat the owner ones.
+_SECTIONS = {
+    (0b01, "owner"): "by_stage",
+    (0b10, "owner"): "by_owner",
+    (0b10, "company"): "by_company",
+    (0b10, "period"): "by_period",
+    (0b11, "owner"): "totals",
+}
+
+
+def analytics_response(rows, bucket: schemas.AnalyticsBucket) -> schemas.DealAnalytics:
+    analytics = {
+        "totals": schemas.DealAggregate(deal_count=0, total_value=0.0, weighted_value=0.0),
+        "by_stage": [], "by_owner": [], "by_company": [], "by_period": [],
+    }
+    for row in rows:
+        dimension = "period" if row.dimension == bucket else row.dimension
+        section = _SECTIONS.get((row.grouping_id, dimension))
+        if section == "by_stage":
+            analytics["by_stage"].append(schemas.DealStageAggregate(stage=row.stage, **_aggregate(row)))
+        elif section == "by_owner":
+            analytics["by_owner"].append(schemas.DealOwnerAggregate(owner_id=row.owner_id, **_aggregate(row)))
+        elif section == "by_company":
+            analytics["by_company"].append(schemas.DealCompanyAggregate(company_id=row.company_id, **_aggregate(row)))
+        elif section == "by_period":
+            analytics["by_period"].append(schemas.DealPeriodAggregate(period=row.period, **_aggregate(row)))
+        elif section == "totals":
+            analytics["totals"] = schemas.DealAggregate(**_aggregate(row))
+    analytics["by_stage"].sort(key=lambda item: list(STAGE_WEIGHTS).index(item.stage) if item.stage else len(STAGE_WEIGHTS))
+    analytics["by_owner"].sort(key=lambda item: -item.total_value)
+    analytics["by_company"].sort(key=lambda item: -item.total_value)
+    analytics["by_period"].sort(key=lambda item: (item.period is None, item.period))
+    return schemas.DealAnalytics(bucket=bucket, **analytics)
+
+
+async def get_deal_analytics(db: AsyncSession, organization_id: int, bucket: schemas.AnalyticsBucket = "month") -> schemas.DealAnalytics:
+    """
+    Deal count, total and weighted value of an organization's deals overall
+    and per stage, owner, company and close-date bucket, in one query.
+    """
+    query = analytics_query(models.DealSummary.__table__, organization_id, bucket)
+    return analytics_response((await db.execute(query)).all(), bucket)
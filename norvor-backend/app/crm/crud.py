@@ -1,120 +1,344 @@
-from sqlalchemy.orm import Session
-from . import schemas
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Collection, Dict, List, Optional
+from . import analytics, schemas
 from .. import models
+from ..db.pagination import paginate, split_page
+from ..db.fieldsets import row_columns
+from ..db.counting import count_for_organization
+from ..db.versions import DEALS, bump_versions_async
+from ..teams.access import get_access_map_async
 import datetime
 from uuid import UUID
 
 
 # --- Company CRUD Functions ---
-def create_company(db: Session, company: schemas.CompanyCreate, organization_id: int):
+async def create_company(db: AsyncSession, company: schemas.CompanyCreate, organization_id: int):
     db_company = models.Company(**company.dict(), organization_id=organization_id)
     db.add(db_company)
-    db.commit()
-    db.refresh(db_company)
+    await db.commit()
+    await db.refresh(db_company)
     return db_company
 
-def get_company(db: Session, company_id: int):
-    return db.query(models.Company).filter(models.Company.id == company_id).first()
+async def get_company(db: AsyncSession, company_id: int):
+    return await db.get(models.Company, company_id)
 
-def get_companies_by_organization(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Company).filter(models.Company.organization_id == organization_id).offset(skip).limit(limit).all()
+async def get_companies_by_organization(db: AsyncSession, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    keys = [models.Company.id]
+    query = select(*row_columns(models.Company, schemas.Company, fields)).where(models.Company.organization_id == organization_id)
+    result = await db.execute(paginate(query, keys, cursor=cursor, skip=skip, limit=limit))
+    return split_page(result.all(), keys, limit)
+
+async def count_companies(db: AsyncSession, organization_id: int):
+    return await count_for_organization(db, models.Company, organization_id)
 
 # --- Contact CRUD Functions ---
-def create_contact(db: Session, contact: schemas.ContactCreate):
+async def create_contact(db: AsyncSession, contact: schemas.ContactCreate, organization_id: int):
     db_contact = models.Contact(
         **contact.dict(),
+        organization_id=organization_id,
         created_at=datetime.date.today()
     )
     db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
+    await db.commit()
+    await db.refresh(db_contact)
     return db_contact
 
-def get_contact(db: Session, contact_id: int):
-    return db.query(models.Contact).filter(models.Contact.id == contact_id).first()
+async def get_contact(db: AsyncSession, contact_id: int):
+    return await db.get(models.Contact, contact_id)
+
+def contacts_query(organization_id: int, fields: Optional[List[str]] = None):
+    """
+    Core select of an organization's contacts shared by the list and export endpoints.
+    """
+    return select(*row_columns(models.Contact, schemas.Contact, fields)).where(models.Contact.organization_id == organization_id)
+
+async def get_contacts(db: AsyncSession, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    keys = [models.Contact.id]
+    query = contacts_query(organization_id, fields)
+    result = await db.execute(paginate(query, keys, cursor=cursor, skip=skip, limit=limit))
+    return split_page(result.all(), keys, limit)
 
-def get_contacts(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Contact).join(models.User, models.Contact.owner_id == models.User.id).filter(models.User.organization_id == organization_id).offset(skip).limit(limit).all()
+async def count_contacts(db: AsyncSession, organization_id: int):
+    return await count_for_organization(db, models.Contact, organization_id)
 
-def update_contact(db: Session, contact_id: int, contact_update: schemas.ContactUpdate):
-    db_contact = get_contact(db, contact_id=contact_id)
+async def update_contact(db: AsyncSession, contact_id: int, contact_update: schemas.ContactUpdate):
+    db_contact = await get_contact(db, contact_id=contact_id)
     if db_contact:
         update_data = contact_update.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_contact, key, value)
-        db.commit()
-        db.refresh(db_contact)
+        await db.commit()
+        await db.refresh(db_contact)
     return db_contact
 
-def delete_contact(db: Session, contact_id: int):
-    db_contact = get_contact(db, contact_id=contact_id)
+async def delete_contact(db: AsyncSession, contact_id: int):
+    db_contact = await get_contact(db, contact_id=contact_id)
     if db_contact:
-        db.delete(db_contact)
-        db.commit()
-    return db_contact    
+        await db.delete(db_contact)
+        await db.commit()
+    return db_contact
 
 # --- Deal CRUD Functions ---
-def create_deal(db: Session, deal: schemas.DealCreate):
-    db_deal = models.Deal(**deal.dict())
+async def create_deal(db: AsyncSession, deal: schemas.DealCreate, organization_id: int):
+    db_deal = models.Deal(**deal.dict(), organization_id=organization_id)
     db.add(db_deal)
-    db.commit()
-    db.refresh(db_deal)
+    await analytics.apply_deal_changes(db, organization_id, added=[deal.dict()])
+    await bump_versions_async(db, organization_id, DEALS)
+    await db.commit()
+    await db.refresh(db_deal)
     return db_deal
 
-def get_deal(db: Session, deal_id: int):
-    return db.query(models.Deal).filter(models.Deal.id == deal_id).first()
+async def get_deal(db: AsyncSession, deal_id: int):
+    return await db.get(models.Deal, deal_id)
+
+async def _lock_deal(db: AsyncSession, deal_id: int):
+    # Reloaded under FOR UPDATE so the summary delta starts from the values
+    # actually being replaced or removed.
+    return await db.get(models.Deal, deal_id, with_for_update=True, populate_existing=True)
+
+def deals_query(organization_id: int, fields: Optional[List[str]] = None):
+    """
+    Core select of an organization's deals shared by the list and export endpoints.
+    """
+    return select(*row_columns(models.Deal, schemas.Deal, fields)).where(models.Deal.organization_id == organization_id)
 
-def get_deals(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Deal).join(models.User, models.Deal.owner_id == models.User.id).filter(models.User.organization_id == organization_id).offset(skip).limit(limit).all()
+async def get_deals(db: AsyncSession, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    keys = [models.Deal.id]
+    query = deals_query(organization_id, fields)
+    result = await db.execute(paginate(query, keys, cursor=cursor, skip=skip, limit=limit))
+    return split_page(result.all(), keys, limit)
 
-def update_deal(db: Session, deal_id: int, deal_update: schemas.DealUpdate):
-    db_deal = get_deal(db, deal_id=deal_id)
+async def count_deals(db: AsyncSession, organization_id: int):
+    return await count_for_organization(db, models.Deal, organization_id)
+
+async def update_deal(db: AsyncSession, deal_id: int, deal_update: schemas.DealUpdate):
+    db_deal = await _lock_deal(db, deal_id)
     if db_deal:
+        before = analytics.deal_values(db_deal)
         update_data = deal_update.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_deal, key, value)
-        db.commit()
-        db.refresh(db_deal)
+        await analytics.apply_deal_changes(db, db_deal.organization_id, removed=[before], added=[analytics.deal_values(db_deal)])
+        await bump_versions_async(db, db_deal.organization_id, DEALS)
+        await db.commit()
+        await db.refresh(db_deal)
     return db_deal
 
-def delete_deal(db: Session, deal_id: int):
-    db_deal = get_deal(db, deal_id=deal_id)
+async def delete_deal(db: AsyncSession, deal_id: int):
+    db_deal = await _lock_deal(db, deal_id)
     if db_deal:
-        db.delete(db_deal)
-        db.commit()
+        await db.delete(db_deal)
+        await analytics.apply_deal_changes(db, db_deal.organization_id, removed=[analytics.deal_values(db_deal)])
+        await bump_versions_async(db, db_deal.organization_id, DEALS)
+        await db.commit()
     return db_deal
 
 # --- Activity CRUD Functions ---
-def create_activity(db: Session, activity: schemas.ActivityCreate):
-    db_activity = models.Activity(**activity.dict())
+async def create_activity(db: AsyncSession, activity: schemas.ActivityCreate, organization_id: int):
+    db_activity = models.Activity(**activity.dict(), organization_id=organization_id)
     db.add(db_activity)
-    db.commit()
-    db.refresh(db_activity)
+    await db.commit()
+    await db.refresh(db_activity)
     return db_activity
 
-def get_activities(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Activity).join(models.User, models.Activity.user_id == models.User.id).filter(models.User.organization_id == organization_id).offset(skip).limit(limit).all()
+def activities_query(organization_id: int, fields: Optional[List[str]] = None):
+    """
+    Core select of an organization's activities shared by the list and export endpoints.
+    """
+    return select(*row_columns(models.Activity, schemas.Activity, fields)).where(models.Activity.organization_id == organization_id)
+
+async def get_activities(db: AsyncSession, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    keys = [models.Activity.id]
+    query = activities_query(organization_id, fields)
+    result = await db.execute(paginate(query, keys, cursor=cursor, skip=skip, limit=limit))
+    return split_page(result.all(), keys, limit)
+
+async def count_activities(db: AsyncSession, organization_id: int):
+    return await count_for_organization(db, models.Activity, organization_id)
 
 # --- NEW OPTIMIZED FUNCTION ---
-def get_deals_for_user(db: Session, user_id: UUID):
+async def get_deals_by_data_cup_ids(db: AsyncSession, data_cup_ids: Collection[UUID]):
     """
-    Get all deals for a user in a single, optimized query using JOINs.
+    Get all deals from a list of DataCup IDs.
     """
-    return db.query(models.Deal).join(models.DataCup).join(models.TeamRole).filter(models.TeamRole.user_id == user_id).all()
+    if not data_cup_ids:
+        return []
+    result = await db.execute(select(models.Deal).where(models.Deal.data_cup_id.in_(data_cup_ids)))
+    return result.scalars().all()
 
-def get_contacts_for_user(db: Session, user_id: UUID):
+async def get_deals_for_user(db: AsyncSession, user_id: UUID):
     """
-    Get all contacts for a user in a single, optimized query using JOINs.
+    Get all deals in the DataCups the user can access (from the cached access map).
     """
-    return db.query(models.Contact).join(models.DataCup).join(models.TeamRole).filter(models.TeamRole.user_id == user_id).all()
+    access = await get_access_map_async(db, user_id)
+    return await get_deals_by_data_cup_ids(db, access.data_cups)
+
+async def get_contacts_by_data_cup_ids(db: AsyncSession, data_cup_ids: Collection[UUID]):
+    """
+    Get all contacts from a list of DataCup IDs.
+    """
+    if not data_cup_ids:
+        return []
+    result = await db.execute(select(models.Contact).where(models.Contact.data_cup_id.in_(data_cup_ids)))
+    return result.scalars().all()
+
+async def get_contacts_for_user(db: AsyncSession, user_id: UUID):
+    """
+    Get all contacts in the DataCups the user can access (from the cached access map).
+    """
+    access = await get_access_map_async(db, user_id)
+    return await get_contacts_by_data_cup_ids(db, access.data_cups)
 
 # --- CRM TASK CRUD FUNCTIONS ---
-def create_crm_task(db: Session, task: schemas.CrmTaskCreate):
-    db_task = models.CrmTask(**task.dict())
+async def create_crm_task(db: AsyncSession, task: schemas.CrmTaskCreate, organization_id: int):
+    db_task = models.CrmTask(**task.dict(), organization_id=organization_id)
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    await db.refresh(db_task)
     return db_task
 
-def get_crm_tasks(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.CrmTask).join(models.User, models.CrmTask.owner_id == models.User.id).filter(models.User.organization_id == organization_id).offset(skip).limit(limit).all()
\ No newline at end of file
+async def get_crm_tasks(db: AsyncSession, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    keys = [models.CrmTask.id]
+    query = select(*row_columns(models.CrmTask, schemas.CrmTask, fields)).where(models.CrmTask.organization_id == organization_id)
+    result = await db.execute(paginate(query, keys, cursor=cursor, skip=skip, limit=limit))
+    return split_page(result.all(), keys, limit)
+
+async def count_crm_tasks(db: AsyncSession, organization_id: int):
+    return await count_for_organization(db, models.CrmTask, organization_id)
+
+# --- Batch CRUD Functions ---
+# Batches run as a handful of set-wise statements in one transaction: one
+# executemany INSERT ... RETURNING (sent as multi-row VALUES), one ownership
+# SELECT plus an executemany UPDATE by primary key, or one ownership SELECT plus
+# one DELETE ... RETURNING. Each returns one result per item; ids outside the
+# organization are "Not found". Foreign keys are checked with one query per
+# field, so items pointing at a missing or another organization's row are
+# skipped with an "Invalid <field>" error, and rows other tables still
+# reference are kept and reported instead of failing the whole batch.
+
+def _versioned(model):
+    return (DEALS,) if model is models.Deal else ()
+
+# Foreign key a batch item may set -> query for the ids an organization owns.
+_REFERENCES = {
+    "company_id": lambda organization_id: select(models.Company.id).where(models.Company.organization_id == organization_id),
+    "contact_id": lambda organization_id: select(models.Contact.id).where(models.Contact.organization_id == organization_id),
+    "deal_id": lambda organization_id: select(models.Deal.id).where(models.Deal.organization_id == organization_id),
+    "owner_id": lambda organization_id: select(models.User.id).where(models.User.organization_id == organization_id),
+    "user_id": lambda organization_id: select(models.User.id).where(models.User.organization_id == organization_id),
+    "data_cup_id": lambda organization_id: (
+        select(models.DataCup.id)
+        .join(models.DataBowl, models.DataCup.data_bowl_id == models.DataBowl.id)
+        .join(models.Team, models.DataBowl.team_id == models.Team.id)
+        .join(models.Department, models.Team.department_id == models.Department.id)
+        .where(models.Department.organization_id == organization_id)
+    ),
+}
+
+# Columns that reference a batch-deletable model's rows.
+_REFERENCED_BY = {
+    models.Contact: (models.Deal.contact_id, models.Activity.contact_id, models.CrmTask.contact_id),
+    models.Deal: (models.CrmTask.deal_id,),
+}
+
+async def _invalid_references(db: AsyncSession, rows: Dict[int, dict], organization_id: int) -> Dict[int, str]:
+    """
+    Item index -> error for the `rows` (by item index) that set a foreign key
+    to a row the organization does not own.
+    """
+    errors = {}
+    for field, owned in _REFERENCES.items():
+        ids = {row[field] for row in rows.values() if row.get(field) is not None}
+        if not ids:
+            continue
+        query = owned(organization_id)
+        valid = set((await db.execute(query.where(query.selected_columns[0].in_(ids)))).scalars())
+        for index, row in rows.items():
+            if index not in errors and row.get(field) is not None and row[field] not in valid:
+                errors[index] = f"Invalid {field}"
+    return errors
+
+async def create_batch(db: AsyncSession, model, items: List, organization_id: int, **defaults) -> List[schemas.BatchItemResult]:
+    rows = {index: {**item.dict(), **defaults, "organization_id": organization_id} for index, item in enumerate(items)}
+    errors = await _invalid_references(db, rows, organization_id)
+    valid = {index: row for index, row in rows.items() if index not in errors}
+    created = {}
+    if valid:
+        result = await db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), list(valid.values()))
+        created = dict(zip(valid, result.scalars().all()))
+        if model is models.Deal:
+            await analytics.apply_deal_changes(db, organization_id, added=valid.values())
+        await bump_versions_async(db, organization_id, *_versioned(model))
+        await db.commit()
+    return [schemas.BatchItemResult(index=index, id=created.get(index), error=errors.get(index)) for index in rows]
+
+async def create_contacts_batch(db: AsyncSession, contacts: List[schemas.ContactCreate], organization_id: int):
+    return await create_batch(db, models.Contact, contacts, organization_id, created_at=datetime.date.today())
+
+async def update_batch(db: AsyncSession, model, items: List, organization_id: int) -> List[schemas.BatchItemResult]:
+    requested = {item.id for item in items}
+    owned = set((await db.execute(
+        select(model.id).where(model.id.in_(requested), model.organization_id == organization_id)
+    )).scalars())
+    updates = {index: item.dict(exclude_unset=True) for index, item in enumerate(items) if item.id in owned}
+    errors = {index: "Not found" for index, item in enumerate(items) if item.id not in owned}
+    errors.update(await _invalid_references(db, updates, organization_id))
+    # Items with only an id have nothing to set.
+    rows = [row for index, row in updates.items() if index not in errors and len(row) > 1]
+    if rows:
+        if model is models.Deal:
+            await _apply_deal_updates(db, rows, organization_id)
+        # ORM bulk UPDATE by primary key: one executemany per distinct set of keys.
+        await db.execute(update(model), rows)
+        await bump_versions_async(db, organization_id, *_versioned(model))
+        await db.commit()
+    return [
+        schemas.BatchItemResult(index=index, id=item.id, error=errors.get(index))
+        for index, item in enumerate(items)
+    ]
+
+async def _apply_deal_updates(db: AsyncSession, rows: List[dict], organization_id: int):
+    columns = [getattr(models.Deal, name) for name in (*analytics.SUMMARY_KEYS, "value")]
+    before = {
+        row.id: row._asdict()
+        for row in await db.execute(
+            select(models.Deal.id, *columns).where(models.Deal.id.in_([row["id"] for row in rows])).with_for_update()
+        )
+    }
+    after = {id: dict(values) for id, values in before.items()}
+    for row in rows:
+        after[row["id"]].update(row)
+    await analytics.apply_deal_changes(db, organization_id, removed=before.values(), added=after.values())
+
+async def _referenced(db: AsyncSession, model, ids: Collection[int]) -> Dict[int, str]:
+    """
+    Id -> error for the `ids` that rows of another table still point at.
+    """
+    errors = {}
+    for column in _REFERENCED_BY.get(model, ()):
+        for id in (await db.execute(select(column).where(column.in_(ids)).distinct())).scalars():
+            errors.setdefault(id, f"Still referenced by {column.table.name}")
+    return errors
+
+async def delete_batch(db: AsyncSession, model, ids: List[int], organization_id: int) -> List[schemas.BatchItemResult]:
+    owned = set((await db.execute(
+        select(model.id).where(model.id.in_(set(ids)), model.organization_id == organization_id)
+    )).scalars())
+    referenced = await _referenced(db, model, owned) if owned else {}
+    statement = delete(model).where(model.id.in_(owned - set(referenced)), model.organization_id == organization_id)
+    if model is models.Deal:
+        statement = statement.returning(model.id, *(getattr(model, name) for name in (*analytics.SUMMARY_KEYS, "value")))
+    else:
+        statement = statement.returning(model.id)
+    removed = (await db.execute(statement)).mappings().all()
+    deleted = {row["id"] for row in removed}
+    if model is models.Deal:
+        await analytics.apply_deal_changes(db, organization_id, removed=removed)
+    if deleted:
+        await bump_versions_async(db, organization_id, *_versioned(model))
+    await db.commit()
+    return [
+        schemas.BatchItemResult(index=index, id=id, error=None if id in deleted else referenced.get(id, "Not found"))
+        for index, id in enumerate(ids)
+    ]
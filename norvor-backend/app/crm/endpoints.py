@@ -1,82 +1,271 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 
-from . import crud, schemas
-from ..db.session import get_db
+from . import analytics, crud, imports, schemas
+from ..db.session import get_async_db, get_async_read_db
+from ..db.pagination import set_next_cursor
+from ..db.export import ExportFormat, export_response
+from ..db.fieldsets import parse_fields, rows_response
+from ..db.counting import set_total_count
+from ..db.versions import DEALS, HIERARCHY, collection_etag_async, not_modified
 from ..users.crud import get_user 
 from ..users.crud import get_user_datacups
-from ..auth.security import get_current_user
+from ..teams.access import get_access_map_async
+from ..auth.security import get_current_principal
+from ..auth.schemas import Principal
 from .. import models
 
 router = APIRouter()
 
+def _batch_response(results: List[schemas.BatchItemResult]) -> schemas.BatchResponse:
+    failed = sum(1 for result in results if result.error)
+    return schemas.BatchResponse(succeeded=len(results) - failed, failed=failed, results=results)
+
 # --- Company Endpoints ---
 @router.post("/companies/", response_model=schemas.Company)
-def create_company(company: schemas.CompanyCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    return crud.create_company(db=db, company=company, organization_id=current_user.organization_id)
+async def create_company(company: schemas.CompanyCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    return await crud.create_company(db=db, company=company, organization_id=current_user.organization_id)
+
+@router.post("/companies/import", response_model=schemas.CsvImportResult)
+async def import_companies(file: UploadFile = File(..., description="CSV with a header row: name,domain"), db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Bulk-load companies from a CSV, skipping domains that are already registered.
+    """
+    return await imports.import_companies_csv(db, file.file, organization_id=current_user.organization_id)
 
 @router.get("/companies/", response_model=List[schemas.Company])
-def read_companies(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    companies = crud.get_companies_by_organization(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
-    return companies
+async def read_companies(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: bool = False, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
+    selected = parse_fields(fields, schemas.Company)
+    companies, next_cursor = await crud.get_companies_by_organization(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        set_total_count(response, await crud.count_companies(db, organization_id=current_user.organization_id))
+    return rows_response(companies, schemas.Company, selected, response)
 
 # --- Contact Endpoints ---
 @router.post("/contacts/", response_model=schemas.Contact)
-def create_contact(contact: schemas.ContactCreate, db: Session = Depends(get_db)):
-    return crud.create_contact(db=db, contact=contact)
+async def create_contact(contact: schemas.ContactCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    return await crud.create_contact(db=db, contact=contact, organization_id=current_user.organization_id)
+
+@router.post("/contacts/batch", response_model=schemas.BatchResponse)
+async def create_contacts_batch(batch: schemas.Batch[schemas.ContactCreate], db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Create many contacts in one transaction.
+    """
+    return _batch_response(await crud.create_contacts_batch(db, batch.items, organization_id=current_user.organization_id))
+
+@router.patch("/contacts/batch", response_model=schemas.BatchResponse)
+async def update_contacts_batch(batch: schemas.Batch[schemas.ContactBatchUpdateItem], db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Partially update many contacts by id in one transaction.
+    """
+    return _batch_response(await crud.update_batch(db, models.Contact, batch.items, organization_id=current_user.organization_id))
+
+@router.post("/contacts/batch/delete", response_model=schemas.BatchResponse)
+async def delete_contacts_batch(batch: schemas.BatchDelete, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Delete many contacts by id in one transaction.
+    """
+    return _batch_response(await crud.delete_batch(db, models.Contact, batch.ids, organization_id=current_user.organization_id))
+
+@router.post("/contacts/import", response_model=schemas.CsvImportResult)
+async def import_contacts(data_cup_id: UUID, file: UploadFile = File(..., description="CSV with a header row: name,email[,phone]"), db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Bulk-load contacts from a CSV into one of the user's DataCups, skipping
+    emails already in the organization and linking contacts to companies by
+    email domain.
+    """
+    access = await get_access_map_async(db, current_user.id)
+    if data_cup_id not in access.data_cups:
+        raise HTTPException(status_code=404, detail="DataCup not found")
+    return await imports.import_contacts_csv(db, file.file, organization_id=current_user.organization_id, data_cup_id=data_cup_id)
 
 @router.get("/contacts/", response_model=List[schemas.Contact])
-def read_contacts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    contacts = crud.get_contacts(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
-    return contacts
+async def read_contacts(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: bool = False, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
+    selected = parse_fields(fields, schemas.Contact)
+    contacts, next_cursor = await crud.get_contacts(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        set_total_count(response, await crud.count_contacts(db, organization_id=current_user.organization_id))
+    return rows_response(contacts, schemas.Contact, selected, response)
+
+@router.get("/contacts/export", response_class=StreamingResponse)
+async def export_contacts(request: Request, format: ExportFormat = "ndjson", current_user: Principal = Depends(get_current_principal)):
+    """
+    Stream every contact in the current user's organization as NDJSON or CSV.
+    """
+    query = crud.contacts_query(current_user.organization_id).order_by(models.Contact.id)
+    return export_response(request, query, schemas.Contact.model_fields, format, "contacts")
 
 @router.get("/my_contacts/", response_model=List[schemas.Contact])
-def read_my_contacts(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def read_my_contacts(db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
     """
     Retrieve all contacts for the current user from all their DataCups using an optimized query.
     """
-    return crud.get_contacts_for_user(db, user_id=current_user.id)
+    return await crud.get_contacts_for_user(db, user_id=current_user.id)
 
 # ... (other contact endpoints)
 
 # --- Deal Endpoints ---
 @router.post("/deals/", response_model=schemas.Deal)
-def create_deal(deal: schemas.DealCreate, db: Session = Depends(get_db)):
-    return crud.create_deal(db=db, deal=deal)
+async def create_deal(deal: schemas.DealCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    return await crud.create_deal(db=db, deal=deal, organization_id=current_user.organization_id)
+
+@router.post("/deals/batch", response_model=schemas.BatchResponse)
+async def create_deals_batch(batch: schemas.Batch[schemas.DealCreate], db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Create many deals in one transaction.
+    """
+    return _batch_response(await crud.create_batch(db, models.Deal, batch.items, organization_id=current_user.organization_id))
+
+@router.patch("/deals/batch", response_model=schemas.BatchResponse)
+async def update_deals_batch(batch: schemas.Batch[schemas.DealBatchUpdateItem], db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Partially update many deals by id in one transaction.
+    """
+    return _batch_response(await crud.update_batch(db, models.Deal, batch.items, organization_id=current_user.organization_id))
+
+@router.post("/deals/batch/delete", response_model=schemas.BatchResponse)
+async def delete_deals_batch(batch: schemas.BatchDelete, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Delete many deals by id in one transaction.
+    """
+    return _batch_response(await crud.delete_batch(db, models.Deal, batch.ids, organization_id=current_user.organization_id))
+
+@router.put("/deals/{deal_id}", response_model=schemas.Deal)
+async def update_deal(deal_id: int, deal: schemas.DealUpdate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    db_deal = await crud.get_deal(db, deal_id=deal_id)
+    if db_deal is None or db_deal.organization_id != current_user.organization_id:
+        raise HTTPException(status_code=404, detail="Deal not found")
+    return await crud.update_deal(db, deal_id=deal_id, deal_update=deal)
+
+@router.delete("/deals/{deal_id}", status_code=204)
+async def delete_deal(deal_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    db_deal = await crud.get_deal(db, deal_id=deal_id)
+    if db_deal is None or db_deal.organization_id != current_user.organization_id:
+        raise HTTPException(status_code=404, detail="Deal not found")
+    await crud.delete_deal(db, deal_id=deal_id)
 
 @router.get("/my_deals/", response_model=List[schemas.Deal])
-def read_my_deals(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def read_my_deals(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
     """
     Retrieve all deals for the current user from all their DataCups using an optimized query.
     """
-    return crud.get_deals_for_user(db, user_id=current_user.id)
+    etag = await collection_etag_async(db, current_user.organization_id, [DEALS, HIERARCHY], scope=current_user.id)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    return await crud.get_deals_for_user(db, user_id=current_user.id)
 
 @router.get("/deals/", response_model=List[schemas.Deal])
-def read_deals(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    deals = crud.get_deals(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
-    return deals
+async def read_deals(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: bool = False, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
+    selected = parse_fields(fields, schemas.Deal)
+    deals, next_cursor = await crud.get_deals(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        set_total_count(response, await crud.count_deals(db, organization_id=current_user.organization_id))
+    return rows_response(deals, schemas.Deal, selected, response)
+
+@router.get("/deals/analytics", response_model=schemas.DealAnalytics)
+async def read_deal_analytics(request: Request, response: Response, bucket: schemas.AnalyticsBucket = "month", db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Pipeline totals: deal count, total and weighted value overall and per
+    stage, owner, company and close-date bucket (week, month or quarter).
+    """
+    etag = await collection_etag_async(db, current_user.organization_id, [DEALS], scope=f"analytics:{bucket}")
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    return await analytics.get_deal_analytics(db, organization_id=current_user.organization_id, bucket=bucket)
+
+@router.get("/deals/export", response_class=StreamingResponse)
+async def export_deals(request: Request, format: ExportFormat = "ndjson", current_user: Principal = Depends(get_current_principal)):
+    """
+    Stream every deal in the current user's organization as NDJSON or CSV.
+    """
+    query = crud.deals_query(current_user.organization_id).order_by(models.Deal.id)
+    return export_response(request, query, schemas.Deal.model_fields, format, "deals")
 
 # ... (other deal endpoints)
 
 # --- Activity Endpoints ---
 @router.post("/activities/", response_model=schemas.Activity)
-def create_activity(activity: schemas.ActivityCreate, db: Session = Depends(get_db)):
-    return crud.create_activity(db=db, activity=activity)
+async def create_activity(activity: schemas.ActivityCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    return await crud.create_activity(db=db, activity=activity, organization_id=current_user.organization_id)
+
+@router.post("/activities/batch", response_model=schemas.BatchResponse)
+async def create_activities_batch(batch: schemas.Batch[schemas.ActivityCreate], db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Create many activities in one transaction.
+    """
+    return _batch_response(await crud.create_batch(db, models.Activity, batch.items, organization_id=current_user.organization_id))
+
+@router.patch("/activities/batch", response_model=schemas.BatchResponse)
+async def update_activities_batch(batch: schemas.Batch[schemas.ActivityBatchUpdateItem], db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Partially update many activities by id in one transaction.
+    """
+    return _batch_response(await crud.update_batch(db, models.Activity, batch.items, organization_id=current_user.organization_id))
+
+@router.post("/activities/batch/delete", response_model=schemas.BatchResponse)
+async def delete_activities_batch(batch: schemas.BatchDelete, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Delete many activities by id in one transaction.
+    """
+    return _batch_response(await crud.delete_batch(db, models.Activity, batch.ids, organization_id=current_user.organization_id))
 
 @router.get("/activities/", response_model=List[schemas.Activity])
-def read_activities(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    activities = crud.get_activities(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
-    return activities
+async def read_activities(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: bool = False, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
+    selected = parse_fields(fields, schemas.Activity)
+    activities, next_cursor = await crud.get_activities(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        set_total_count(response, await crud.count_activities(db, organization_id=current_user.organization_id))
+    return rows_response(activities, schemas.Activity, selected, response)
+
+@router.get("/activities/export", response_class=StreamingResponse)
+async def export_activities(request: Request, format: ExportFormat = "ndjson", current_user: Principal = Depends(get_current_principal)):
+    """
+    Stream every activity in the current user's organization as NDJSON or CSV.
+    """
+    query = crud.activities_query(current_user.organization_id).order_by(models.Activity.id)
+    return export_response(request, query, schemas.Activity.model_fields, format, "activities")
 
 # --- CRM TASK ENDPOINTS ---
 @router.post("/tasks/", response_model=schemas.CrmTask)
-def create_crm_task(task: schemas.CrmTaskCreate, db: Session = Depends(get_db)):
-    return crud.create_crm_task(db=db, task=task)
+async def create_crm_task(task: schemas.CrmTaskCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    return await crud.create_crm_task(db=db, task=task, organization_id=current_user.organization_id)
+
+
+@router.post("/tasks/batch", response_model=schemas.BatchResponse)
+async def create_crm_tasks_batch(batch: schemas.Batch[schemas.CrmTaskCreate], db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Create many CRM tasks in one transaction.
+    """
+    return _batch_response(await crud.create_batch(db, models.CrmTask, batch.items, organization_id=current_user.organization_id))
 
+@router.patch("/tasks/batch", response_model=schemas.BatchResponse)
+async def update_crm_tasks_batch(batch: schemas.Batch[schemas.CrmTaskBatchUpdateItem], db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Partially update many CRM tasks by id in one transaction.
+    """
+    return _batch_response(await crud.update_batch(db, models.CrmTask, batch.items, organization_id=current_user.organization_id))
+
+@router.post("/tasks/batch/delete", response_model=schemas.BatchResponse)
+async def delete_crm_tasks_batch(batch: schemas.BatchDelete, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
+    """
+    Delete many CRM tasks by id in one transaction.
+    """
+    return _batch_response(await crud.delete_batch(db, models.CrmTask, batch.ids, organization_id=current_user.organization_id))
 
 @router.get("/tasks/", response_model=List[schemas.CrmTask])
-def read_crm_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    tasks = crud.get_crm_tasks(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
-    return tasks
\ No newline at end of file
+async def read_crm_tasks(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: bool = False, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
+    selected = parse_fields(fields, schemas.CrmTask)
+    tasks, next_cursor = await crud.get_crm_tasks(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        set_total_count(response, await crud.count_crm_tasks(db, organization_id=current_user.organization_id))
+    return rows_response(tasks, schemas.CrmTask, selected, response)
\ No newline at end of file
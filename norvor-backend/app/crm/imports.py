@@ -0,0 +1,199 @@
+import csv
+import io
+import time
+from typing import AsyncIterator, BinaryIO, Callable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import schemas
+from ..core.config import settings
+
+# --- CSV Imports ---
+# Uploads are parsed a batch of rows at a time and validated in Python, so a
+# row only reaches the database if the API could serialize it again (emails
+# go through the same EmailStr as schemas.Contact). Valid rows are streamed
+# with COPY into a temporary staging table (dropped on commit), then merged
+# into the real table with one INSERT ... SELECT. Dedup and company linking
+# happen in that statement: contacts by lowercase email within the
+# organization, companies by lowercase domain, and contacts join companies on
+# their email's domain. Rejected rows are listed in the result; duplicates are
+# only counted.
+
+# Staged columns; the optional ones may be absent from the CSV header.
+CONTACT_COLUMNS = ("name", "email", "phone")
+COMPANY_COLUMNS = ("name", "domain")
+OPTIONAL_COLUMNS = {"phone"}
+
+_email = TypeAdapter(EmailStr)
+
+MERGE_CONTACTS = text("""
+    INSERT INTO contacts (name, email, phone, organization_id, data_cup_id, created_at, company_id)
+    SELECT DISTINCT ON (lower(s.email))
+           s.name, lower(s.email), NULLIF(s.phone, ''), CAST(:organization_id AS integer), CAST(:data_cup_id AS uuid), current_date, c.id
+    FROM contact_import s
+    LEFT JOIN companies c
+           ON c.organization_id = :organization_id
+          AND lower(c.domain) = lower(split_part(s.email, '@', 2))
+    WHERE NOT EXISTS (
+          SELECT 1 FROM contacts x
+          WHERE x.organization_id = :organization_id AND lower(x.email) = lower(s.email)
+      )
+    ORDER BY lower(s.email), c.id
+""")
+
+# Company.domain is unique across all organizations.
+FOREIGN_DOMAINS = text("""
+    SELECT s.row_number, s.domain
+    FROM company_import s
+    WHERE EXISTS (
+        SELECT 1 FROM companies x
+        WHERE lower(x.domain) = lower(s.domain) AND x.organization_id IS DISTINCT FROM :organization_id
+    )
+    ORDER BY s.row_number
+""")
+
+MERGE_COMPANIES = text("""
+    INSERT INTO companies (name, domain, organization_id)
+    SELECT DISTINCT ON (lower(s.domain)) s.name, lower(s.domain), CAST(:organization_id AS integer)
+    FROM company_import s
+    WHERE NOT EXISTS (SELECT 1 FROM companies x WHERE lower(x.domain) = lower(s.domain))
+    ORDER BY lower(s.domain)
+    ON CONFLICT (domain) DO NOTHING
+""")
+
+
+class _Progress:
+    def __init__(self):
+        self.rows = 0
+        self.errors: List[schemas.CsvImportError] = []
+
+    def reject(self, row: int, value: Optional[str], error: str):
+        if len(self.errors) < settings.CSV_IMPORT_MAX_ERRORS:
+            self.errors.append(schemas.CsvImportError(row=row, value=value, error=error))
+
+
+def _check_contact(record: tuple) -> Tuple[Optional[tuple], Optional[str]]:
+    name, email, phone = record
+    if not name:
+        return None, "Missing name"
+    try:
+        email = _email.validate_python(email)
+    except ValidationError:
+        return None, "Invalid email"
+    return (name, email, phone), None
+
+
+def _check_company(record: tuple) -> Tuple[Optional[tuple], Optional[str]]:
+    name, domain = record
+    if not name:
+        return None, "Missing name"
+    if not domain:
+        return None, "Missing domain"
+    return record, None
+
+
+def _reader(file: BinaryIO, columns: Sequence[str]):
+    reader = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    header = [name.strip().lower() for name in next(reader, [])]
+    missing = [name for name in columns if name not in header and name not in OPTIONAL_COLUMNS]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"CSV is missing columns: {', '.join(missing)}")
+    positions = [header.index(name) if name in header else None for name in columns]
+    return reader, positions
+
+
+def _read_batch(reader, positions: List[Optional[int]], size: int, check: Callable, progress: _Progress) -> Optional[List[tuple]]:
+    """
+    The next batch of valid records (row number first); None at end of file.
+    """
+    batch, read = [], 0
+    for row in reader:
+        read += 1
+        progress.rows += 1
+        record = tuple(row[position].strip() if position is not None and position < len(row) else None for position in positions)
+        record, error = check(record)
+        if error:
+            progress.reject(progress.rows, _record_value(row, positions), error)
+        else:
+            batch.append((progress.rows, *record))
+        if read == size:
+            break
+    return batch if read else None
+
+
+def _record_value(row: list, positions: List[Optional[int]]) -> Optional[str]:
+    # The email or domain column, for error reports.
+    position = positions[1]
+    return row[position].strip() if position is not None and position < len(row) else None
+
+
+async def _records(file: BinaryIO, columns: Sequence[str], check: Callable, progress: _Progress) -> AsyncIterator[tuple]:
+    # The upload is already spooled to disk; reading it off the event loop
+    # keeps other requests responsive while a large file is parsed.
+    reader, positions = await run_in_threadpool(_reader, file, columns)
+    while True:
+        batch = await run_in_threadpool(_read_batch, reader, positions, settings.CSV_IMPORT_BATCH_SIZE, check, progress)
+        if batch is None:
+            return
+        for record in batch:
+            yield record
+
+
+async def _stage(db: AsyncSession, table: str, columns: Sequence[str], file: BinaryIO, check: Callable) -> _Progress:
+    """
+    COPY the CSV's valid rows into a temporary `table` (`row_number` plus `columns`).
+    """
+    definition = ", ".join(["row_number integer", *(f"{name} text" for name in columns)])
+    await db.execute(text(f"CREATE TEMP TABLE {table} ({definition}) ON COMMIT DROP"))
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    progress = _Progress()
+    await raw.driver_connection.copy_records_to_table(
+        table, records=_records(file, columns, check, progress), columns=["row_number", *columns]
+    )
+    return progress
+
+
+def _result(progress: _Progress, imported: int, started: float) -> schemas.CsvImportResult:
+    seconds = time.perf_counter() - started
+    return schemas.CsvImportResult(
+        rows=progress.rows,
+        imported=imported,
+        skipped=progress.rows - imported,
+        seconds=round(seconds, 3),
+        rows_per_second=round(progress.rows / seconds) if seconds > 0 else progress.rows,
+        errors=sorted(progress.errors, key=lambda error: error.row),
+    )
+
+
+async def import_contacts_csv(db: AsyncSession, file: BinaryIO, organization_id: int, data_cup_id: UUID) -> schemas.CsvImportResult:
+    """
+    Import contacts (name, email[, phone]) into `data_cup_id`. Rows without a
+    name or a valid email are rejected; rows whose email already exists in the
+    organization, or repeats within the file, are skipped.
+    """
+    started = time.perf_counter()
+    progress = await _stage(db, "contact_import", CONTACT_COLUMNS, file, _check_contact)
+    result = await db.execute(MERGE_CONTACTS, {"organization_id": organization_id, "data_cup_id": data_cup_id})
+    await db.commit()
+    return _result(progress, result.rowcount, started)
+
+
+async def import_companies_csv(db: AsyncSession, file: BinaryIO, organization_id: int) -> schemas.CsvImportResult:
+    """
+    Import companies (name, domain). Rows without a name or domain, or whose
+    domain belongs to another organization, are rejected; domains the
+    organization already has, or that repeat within the file, are skipped.
+    """
+    started = time.perf_counter()
+    progress = await _stage(db, "company_import", COMPANY_COLUMNS, file, _check_company)
+    for row_number, domain in (await db.execute(FOREIGN_DOMAINS, {"organization_id": organization_id})).all():
+        progress.reject(row_number, domain, "Domain belongs to another organization")
+    result = await db.execute(MERGE_COMPANIES, {"organization_id": organization_id})
+    await db.commit()
+    return _result(progress, result.rowcount, started)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from datetime import date, datetime
+from pydantic import BaseModel, EmailStr, Field
+from typing import Generic, Literal, Optional, List, TypeVar
+from datetime import date, date as Date, datetime
 from uuid import UUID
 from ..models import DealStage, ActivityType, CrmTaskStatus # Import CrmTaskStatus
 
@@ -90,6 +90,14 @@ class ActivityBase(BaseModel):
 class ActivityCreate(ActivityBase):
     pass
 
+class ActivityUpdate(BaseModel):
+    type: Optional[ActivityType] = None
+    notes: Optional[str] = None
+    # The field shadows the `date` type inside this class body.
+    date: Optional[Date] = None
+    contact_id: Optional[int] = None
+    user_id: Optional[UUID] = None
+
 class Activity(ActivityBase):
     id: int
 
@@ -120,4 +128,78 @@ class CrmTask(CrmTaskBase):
     deal_id: Optional[int] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- Batch Schemas ---
+ItemT = TypeVar("ItemT")
+
+class Batch(BaseModel, Generic[ItemT]):
+    items: List[ItemT] = Field(..., min_length=1, max_length=1000)
+
+class BatchDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class ContactBatchUpdateItem(ContactUpdate):
+    id: int
+
+class DealBatchUpdateItem(DealUpdate):
+    id: int
+
+class ActivityBatchUpdateItem(ActivityUpdate):
+    id: int
+
+class CrmTaskBatchUpdateItem(CrmTaskUpdate):
+    id: int
+
+class BatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item (or id) in the request")
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+# --- CSV Import Schemas ---
+class CsvImportError(BaseModel):
+    row: int = Field(..., description="1-based position of the row in the upload")
+    value: Optional[str] = Field(None, description="The row's email (contacts) or domain (companies)")
+    error: str
+
+class CsvImportResult(BaseModel):
+    rows: int = Field(..., description="Data rows read from the CSV")
+    imported: int
+    skipped: int = Field(..., description="Rejected rows and duplicates (within the file or of existing records)")
+    seconds: float
+    rows_per_second: int
+    errors: List[CsvImportError] = Field(default_factory=list, description="Rejected rows (duplicates are not listed), up to CSV_IMPORT_MAX_ERRORS")
+
+# --- Deal Analytics Schemas ---
+AnalyticsBucket = Literal["week", "month", "quarter"]
+
+class DealAggregate(BaseModel):
+    deal_count: int
+    total_value: float
+    weighted_value: float = Field(..., description="Value weighted by each stage's win probability")
+
+class DealStageAggregate(DealAggregate):
+    stage: Optional[DealStage] = None
+
+class DealOwnerAggregate(DealAggregate):
+    owner_id: Optional[UUID] = None
+
+class DealCompanyAggregate(DealAggregate):
+    company_id: Optional[int] = None
+
+class DealPeriodAggregate(DealAggregate):
+    period: Optional[Date] = Field(None, description="First day of the close-date bucket; null for deals without a close date")
+
+class DealAnalytics(BaseModel):
+    bucket: AnalyticsBucket
+    totals: DealAggregate
+    by_stage: List[DealStageAggregate]
+    by_owner: List[DealOwnerAggregate]
+    by_company: List[DealCompanyAggregate]
+    by_period: List[DealPeriodAggregate]
+
@@ -0,0 +1,71 @@
+import json
+from typing import NamedTuple, Optional
+
+from fastapi import Response
+from sqlalchemy import func, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+
+# --- Cheap List Totals ---
+# An exact count(*) over a large tenant reads every matching index entry, so
+# totals are counted exactly only up to EXACT_COUNT_THRESHOLD rows (a LIMITed
+# scan that stops early). Above that the planner's row estimate is used and
+# cached per (table, organization) for COUNT_CACHE_TTL_SECONDS.
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
+_large_counts = TTLCache(maxsize=10000, ttl=settings.COUNT_CACHE_TTL_SECONDS)
+
+
+class Total(NamedTuple):
+    count: int
+    estimated: bool
+
+
+async def _planner_estimate(db: AsyncSession, query) -> Optional[int]:
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = query.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+    if isinstance(plan, str):
+        # asyncpg returns json columns undecoded.
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_for_organization(db: AsyncSession, model, organization_id: int) -> Total:
+    """
+    Total rows of `model` in an organization: exact for small tenants,
+    a cached planner estimate for large ones.
+    """
+    key = (model.__tablename__, organization_id)
+    cached = _large_counts.get(key)
+    if cached is not None:
+        return cached
+
+    threshold = settings.EXACT_COUNT_THRESHOLD
+    matching = select(literal(1)).select_from(model).where(model.organization_id == organization_id)
+    bounded = select(func.count()).select_from(matching.limit(threshold + 1).subquery())
+    count = (await db.execute(bounded)).scalar()
+    if count <= threshold:
+        return Total(count, False)
+
+    estimate = await _planner_estimate(db, matching)
+    if estimate is None:
+        exact = select(func.count()).select_from(model).where(model.organization_id == organization_id)
+        total = Total((await db.execute(exact)).scalar(), False)
+    else:
+        # The estimate can undershoot; never report fewer rows than were just seen.
+        total = Total(max(estimate, count), True)
+    _large_counts.set(key, total)
+    return total
+
+
+def set_total_count(response: Response, total: Total):
+    response.headers[TOTAL_COUNT_HEADER] = str(total.count)
+    if total.estimated:
+        response.headers[TOTAL_ESTIMATED_HEADER] = "true"
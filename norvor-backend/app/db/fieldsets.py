@@ -0,0 +1,94 @@
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+from ..core.responses import FastJSONResponse
+
+# --- Sparse Fieldsets ---
+# `?fields=id,name,stage` narrows a list response to the named fields of its
+# response schema. CRUD functions turn the names into load_only() so other
+# columns are never read, and relationships are only loaded when requested.
+# The page is then serialized field by field instead of through the full model.
+#
+# Flat schemas (every field a column) skip the ORM entirely: the list query
+# selects Core rows of just the needed columns, which bypass the identity map,
+# and the rows go straight to orjson. The endpoint keeps its response_model,
+# so the OpenAPI schema is unchanged.
+
+
+def parse_fields(fields: Optional[str], schema) -> Optional[List[str]]:
+    """
+    Split a comma-separated `fields` parameter and check every name against
+    the response schema. Returns None when no fieldset was requested.
+    """
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return names or None
+
+
+def load_only_fields(model, fields: Sequence[str]):
+    """
+    A load_only() option for the column-backed names in `fields`. The primary
+    key is always loaded, so identity and keyset pagination keep working.
+    """
+    mapper = inspect(model)
+    names = [attr.key for attr in mapper.column_attrs if attr.columns[0].primary_key]
+    names += [name for name in fields if name in mapper.column_attrs and name not in names]
+    return load_only(*(getattr(model, name) for name in names))
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema, name: str) -> TypeAdapter:
+    return TypeAdapter(schema.model_fields[name].annotation)
+
+
+def serialize_fields(item, schema, fields: Sequence[str]) -> dict:
+    data = {}
+    for name in fields:
+        field = schema.model_fields[name]
+        value = getattr(item, name, None)
+        if value is None and not field.is_required():
+            value = field.get_default(call_default_factory=True)
+        adapter = _adapter(schema, name)
+        data[name] = adapter.dump_python(adapter.validate_python(value, from_attributes=True), mode="json")
+    return data
+
+
+def sparse_response(items, schema, fields: Sequence[str], response: Response) -> JSONResponse:
+    """
+    Serialize only `fields` of each item, keeping headers already set on the
+    endpoint's `response` (cursor, totals).
+    """
+    headers = {key: value for key, value in response.headers.items() if key not in ("content-length", "content-type")}
+    return JSONResponse([serialize_fields(item, schema, fields) for item in items], headers=headers)
+
+
+def row_columns(model, schema, fields: Optional[Sequence[str]] = None) -> list:
+    """
+    Columns to select for a flat schema: the requested fields (all of them by
+    default) in order, then the primary key if it was not requested, since
+    keyset pagination needs it.
+    """
+    names = list(fields or schema.model_fields)
+    names += [column.key for column in inspect(model).primary_key if column.key not in names]
+    return [getattr(model, name) for name in names]
+
+
+def rows_response(rows, schema, fields: Optional[Sequence[str]], response: Response) -> FastJSONResponse:
+    """
+    Encode Core rows from a `row_columns` select, keeping headers already set
+    on the endpoint's `response` (cursor, totals).
+    """
+    names = list(fields or schema.model_fields)
+    headers = {key: value for key, value in response.headers.items() if key not in ("content-length", "content-type")}
+    # Rows are positional in `names` order; zip() drops a trailing unrequested key.
+    return FastJSONResponse([dict(zip(names, row)) for row in rows], headers=headers)
@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (in milliseconds) of the checkout latency histogram buckets.
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """
+    Per-process counters for one connection pool.
+    """
+
+    def __init__(self, name: str, max_overflow: int):
+        self.name = name
+        self.max_overflow = max_overflow
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.waits = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.overflow_checkouts = 0
+            self.peak_overflow = 0
+            self.latency_sum_ms = 0.0
+            self.latency_max_ms = 0.0
+            self.latency_buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, elapsed_ms: float, waited: bool, overflow: int):
+        with self._lock:
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+            if overflow > 0:
+                self.overflow_checkouts += 1
+            self.peak_overflow = max(self.peak_overflow, overflow)
+            self.latency_sum_ms += elapsed_ms
+            self.latency_max_ms = max(self.latency_max_ms, elapsed_ms)
+            for index, bound in enumerate(CHECKOUT_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.latency_buckets[index] += 1
+                    break
+            else:
+                self.latency_buckets[-1] += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool) -> Dict:
+        with self._lock:
+            labels = [str(bound) for bound in CHECKOUT_BUCKETS_MS] + ["+Inf"]
+            return {
+                "pool": self.name,
+                "pid": os.getpid(),
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": self.max_overflow,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "overflow_checkouts": self.overflow_checkouts,
+                "peak_overflow": self.peak_overflow,
+                "checkout_latency_ms": {
+                    "count": self.checkouts,
+                    "sum": round(self.latency_sum_ms, 3),
+                    "max": round(self.latency_max_ms, 3),
+                    "buckets": dict(zip(labels, self.latency_buckets)),
+                },
+            }
+
+
+class _InstrumentedPoolMixin:
+    """
+    Times every checkout and notes whether the caller had to wait because
+    every pooled and overflow connection was already in use.
+    """
+    metrics = None
+
+    def _do_get(self):
+        metrics = self.metrics
+        if metrics is None:
+            return super()._do_get()
+        waited = (
+            metrics.max_overflow >= 0
+            and self.checkedin() == 0
+            and self.overflow() >= metrics.max_overflow
+        )
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            metrics.record_timeout()
+            raise
+        metrics.record_checkout((time.perf_counter() - started) * 1000, waited, self.overflow())
+        return connection
+
+    def recreate(self):
+        # Pools are recreated on engine.dispose(); keep counting into the same metrics.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# --- Registry of instrumented engines, keyed by pool name ---
+_engines = {}
+
+
+def instrument_engine(engine, name: str, max_overflow: int):
+    """
+    Attach metrics to a sync engine (for async engines pass `engine.sync_engine`).
+    """
+    metrics = PoolMetrics(name, max_overflow)
+    engine.pool.metrics = metrics
+    _engines[name] = engine
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.increment("checkins")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.increment("connects")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+    return metrics
+
+
+def pool_snapshot():
+    """
+    Current metrics for every instrumented pool in this worker.
+    """
+    return [engine.pool.metrics.snapshot(engine.pool) for engine in _engines.values()]
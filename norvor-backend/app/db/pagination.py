@@ -0,0 +1,73 @@
+import base64
+import json
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+# --- Keyset (Cursor) Pagination ---
+# List queries are ordered by a unique key and a page continues from the key
+# of the previous page's last row (`WHERE key > :last`), so deep pages cost
+# the same as the first one and rows inserted meanwhile never shift a page.
+# The cursor is opaque to clients: URL-safe base64 of the last row's key.
+# `skip` (offset) paging still works when no cursor is given.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> list:
+    """
+    Decode a cursor back into key values of the columns' Python types.
+    Raises a 400 for anything that was not produced by `encode_cursor`.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(cursor)
+        return [key.type.python_type(value) for key, value in zip(keys, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query, keys: Sequence, cursor: Optional[str] = None, skip: int = 0, limit: int = 100):
+    """
+    Order a `select()` or ORM `Query` by `keys` and restrict it to one page.
+    One row beyond `limit` is fetched so `split_page` can tell whether
+    another page follows.
+    """
+    query = query.order_by(*keys)
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        if len(keys) == 1:
+            query = query.filter(keys[0] > values[0])
+        else:
+            query = query.filter(tuple_(*keys) > tuple_(*values))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def split_page(rows: Sequence, keys: Sequence, limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Trim the look-ahead row from a `paginate` result and build the cursor
+    for the next page (None on the last page).
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    if not rows:
+        return rows, None
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key.key) for key in keys])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Per-Request Query Profiling ---
+# Engine events record every statement into the stats object of the request
+# that issued it. The stats live in a context variable, which Starlette copies
+# into the threadpool for sync endpoints and asyncio copies into tasks.
+
+
+class RequestStats:
+    def __init__(self):
+        self.query_count = 0
+        self.db_time_ms = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.query_count += 1
+        self.db_time_ms += elapsed_ms
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int):
+        """
+        Statements executed at least `threshold` times: the usual N+1 signature.
+        """
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_query_stats", default=None)
+
+# Aggregates per route template, for the monitoring endpoint.
+_route_stats = {}
+_route_stats_lock = threading.Lock()
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def instrument_queries(engine):
+    """
+    Attach the query-recording listeners to a sync engine
+    (for async engines pass `engine.sync_engine`).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def _record_route(route: str, stats: RequestStats):
+    with _route_stats_lock:
+        entry = _route_stats.setdefault(route, {"requests": 0, "queries": 0, "max_queries": 0, "db_time_ms": 0.0})
+        entry["requests"] += 1
+        entry["queries"] += stats.query_count
+        entry["max_queries"] = max(entry["max_queries"], stats.query_count)
+        entry["db_time_ms"] = round(entry["db_time_ms"] + stats.db_time_ms, 3)
+
+
+def route_snapshot():
+    with _route_stats_lock:
+        return {route: dict(entry) for route, entry in sorted(_route_stats.items())}
+
+
+async def profile_queries(request: Request, call_next):
+    """
+    Middleware that counts queries and DB time per request, emits a
+    Server-Timing header and warns when a route exceeds its query budget or
+    repeats the same statement (a likely N+1 lazy load).
+    """
+    stats = RequestStats()
+    token = _current_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+    total_ms = (time.perf_counter() - started) * 1000
+
+    response.headers["Server-Timing"] = (
+        f'db;dur={stats.db_time_ms:.1f};desc="{stats.query_count} queries", app;dur={total_ms:.1f}'
+    )
+
+    # Only matched route templates become keys: raw 404 paths and arbitrary
+    # methods would grow _route_stats without bound.
+    route = request.scope.get("route")
+    if route is None:
+        route_key = "<unmatched>"
+    else:
+        method = request.method if request.method in (getattr(route, "methods", None) or ()) else "<other>"
+        route_key = f"{method} {route.path}"
+    _record_route(route_key, stats)
+
+    if stats.query_count > settings.QUERY_BUDGET:
+        logger.warning(
+            "%s ran %d queries (budget %d, %.1f ms in DB)",
+            route_key, stats.query_count, settings.QUERY_BUDGET, stats.db_time_ms,
+        )
+    for statement, count in stats.repeated_statements(settings.QUERY_REPEAT_THRESHOLD):
+        logger.warning(
+            "%s repeated a statement %d times (possible N+1): %s",
+            route_key, count, " ".join(statement.split())[:300],
+        )
+    return response
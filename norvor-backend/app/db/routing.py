@@ -0,0 +1,48 @@
+import hashlib
+import time
+
+from fastapi import Request
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+
+# --- Read-Your-Writes Routing ---
+# After a client writes, its reads stay on the primary for a short window so
+# it never reads a replica that has not caught up with its own change. The
+# window is tracked in-process (keyed by bearer token, else client address)
+# and in a cookie, so it also holds when the next request reaches another worker.
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+STICKY_COOKIE = "norvor_primary_until"
+
+_recent_writers = TTLCache(maxsize=100000, ttl=settings.READ_AFTER_WRITE_WINDOW_SECONDS)
+
+
+def _client_key(request: Request) -> str:
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha1(authorization.encode()).hexdigest()
+    return request.client.host if request.client else ""
+
+
+def prefers_primary(request: Request) -> bool:
+    """
+    True if this client wrote recently and should read from the primary.
+    """
+    if _recent_writers.get(_client_key(request)):
+        return True
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def read_your_writes(request: Request, call_next):
+    """
+    Middleware that pins a client to the primary after a successful write.
+    """
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        window = settings.READ_AFTER_WRITE_WINDOW_SECONDS
+        _recent_writers.set(_client_key(request), True)
+        response.set_cookie(STICKY_COOKIE, str(time.time() + window), max_age=window, httponly=True)
+    return response
@@ -1,14 +1,75 @@
 # app/db/session.py
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from ..core.config import settings
+from .metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument_engine
+from .profiling import instrument_queries
+from .routing import prefers_primary
 
-engine = create_engine(settings.DATABASE_URL)
+pool_options = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+# --- Sync engine: used by the sync routers and by scripts like seed_cloud.py ---
+engine = create_engine(settings.DATABASE_URL, poolclass=InstrumentedQueuePool, **pool_options)
+instrument_engine(engine, "primary", settings.DB_MAX_OVERFLOW)
+instrument_queries(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- Async engine (asyncpg): used by the async routers (CRM, PM, docs) ---
+# expire_on_commit=False keeps attributes loaded after commit, since an
+# AsyncSession cannot lazily reload them during response serialization.
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **pool_options)
+instrument_engine(async_engine.sync_engine, "primary_async", settings.DB_MAX_OVERFLOW)
+instrument_queries(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# --- Read replica engines: fall back to the primary when DATABASE_READ_URL is unset ---
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(settings.DATABASE_READ_URL, poolclass=InstrumentedQueuePool, **pool_options)
+    instrument_engine(read_engine, "replica", settings.DB_MAX_OVERFLOW)
+    instrument_queries(read_engine)
+    async_read_engine = create_async_engine(settings.ASYNC_DATABASE_READ_URL, poolclass=InstrumentedAsyncQueuePool, **pool_options)
+    instrument_engine(async_read_engine.sync_engine, "replica_async", settings.DB_MAX_OVERFLOW)
+    instrument_queries(async_read_engine.sync_engine)
+else:
+    read_engine = engine
+    async_read_engine = async_engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db(request: Request):
+    """
+    Session for read-only routes: the replica, unless this client wrote recently.
+    """
+    factory = SessionLocal if prefers_primary(request) else ReadSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    """
+    Async session for read-only routes: the replica, unless this client wrote recently.
+    """
+    factory = AsyncSessionLocal if prefers_primary(request) else AsyncReadSessionLocal
+    async with factory() as db:
+        yield db
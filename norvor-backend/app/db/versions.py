@@ -0,0 +1,96 @@
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+
+# --- Per-Organization Collection Versions ---
+# Every create/update/delete bumps its collection's counter for the tenant in
+# the same transaction, so a version never moves without the data it covers.
+# Polled reads derive their ETag from the counters alone (one primary-key
+# lookup) and answer a matching If-None-Match with 304 before running the
+# real query or serializing anything.
+
+DEALS = "deals"
+PROJECTS = "projects"
+DOCS = "docs"
+# Departments, teams, team roles and data cups: who can see which data cups.
+HIERARCHY = "hierarchy"
+# The organization row itself: name and onboarding state.
+ORGANIZATION = "organization"
+
+
+def _bump_statement(organization_id: int, collections: Iterable[str]):
+    statement = insert(models.CollectionVersion).values(
+        [{"organization_id": organization_id, "collection": collection, "version": 1} for collection in collections]
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[models.CollectionVersion.organization_id, models.CollectionVersion.collection],
+        set_={"version": models.CollectionVersion.version + 1},
+    )
+
+
+def bump_versions(db: Session, organization_id: Optional[int], *collections: str):
+    """
+    Increment the given collections' versions. Call before the write's commit.
+    """
+    if organization_id is not None and collections:
+        db.execute(_bump_statement(organization_id, collections))
+
+
+async def bump_versions_async(db: AsyncSession, organization_id: Optional[int], *collections: str):
+    if organization_id is not None and collections:
+        await db.execute(_bump_statement(organization_id, collections))
+
+
+def _versions_query(organization_id: int, collections: Iterable[str]):
+    return select(models.CollectionVersion.collection, models.CollectionVersion.version).where(
+        models.CollectionVersion.organization_id == organization_id,
+        models.CollectionVersion.collection.in_(list(collections)),
+    )
+
+
+def versions_etag(organization_id: int, collections, versions: dict, scope=None) -> str:
+    parts = [str(organization_id), str(scope or "")]
+    parts += [f"{collection}:{versions.get(collection, 0)}" for collection in collections]
+    return 'W/"' + hashlib.sha1("|".join(parts).encode()).hexdigest()[:20] + '"'
+
+
+def collection_versions(db: Session, organization_id: int, collections: list) -> dict:
+    """
+    Current version of each of `collections` (missing ones are 0).
+    """
+    versions = dict(db.execute(_versions_query(organization_id, collections)).all())
+    return {collection: versions.get(collection, 0) for collection in collections}
+
+
+def collection_etag(db: Session, organization_id: int, collections: list, scope=None) -> str:
+    """
+    ETag over the current versions of `collections`. Pass `scope` (e.g. the
+    user id) when the response also depends on who is asking.
+    """
+    return versions_etag(organization_id, collections, collection_versions(db, organization_id, collections), scope)
+
+
+async def collection_etag_async(db: AsyncSession, organization_id: int, collections: list, scope=None) -> str:
+    versions = dict((await db.execute(_versions_query(organization_id, collections))).all())
+    return versions_etag(organization_id, collections, versions, scope)
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Tag the response with `etag` and return a 304 response if the client's
+    If-None-Match already has it (None means: build the full response).
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+    # If-None-Match uses weak comparison: W/"x" and "x" match.
+    candidates = {tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")}
+    if etag.removeprefix("W/") in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return None
@@ -1,68 +1,96 @@
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Collection, List, Optional
 import uuid
 
 from . import schemas
 from .. import models
+from ..db.pagination import paginate, split_page
+from ..db.fieldsets import row_columns
+from ..db.counting import count_for_organization
+from ..db.versions import DOCS, bump_versions_async
+from ..teams.access import get_access_map_async
 from uuid import UUID
 
 
-def create_doc(db: Session, doc: schemas.DocCreate):
+async def create_doc(db: AsyncSession, doc: schemas.DocCreate):
     """
     Create a new document.
     """
     generated_id = f"doc_{uuid.uuid4().hex}"
-    
+
     db_doc = models.Doc(
         **doc.dict(),
         id=generated_id
     )
     db.add(db_doc)
-    db.commit()
-    db.refresh(db_doc)
+    await bump_versions_async(db, db_doc.organization_id, DOCS)
+    await db.commit()
+    await db.refresh(db_doc)
     return db_doc
 
-def get_doc(db: Session, doc_id: str):
+async def get_doc(db: AsyncSession, doc_id: str):
     """
     Get a single document by its ID.
     """
-    return db.query(models.Doc).filter(models.Doc.id == doc_id).first()
+    return await db.get(models.Doc, doc_id)
 
 # --- MODIFY THIS FUNCTION ---
-def get_all_docs(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
+async def get_all_docs(db: AsyncSession, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    """
+    Get one page of documents for a specific organization, plus the cursor of the next page.
+    """
+    keys = [models.Doc.id]
+    query = select(*row_columns(models.Doc, schemas.Doc, fields)).where(models.Doc.organization_id == organization_id)
+    result = await db.execute(paginate(query, keys, cursor=cursor, skip=skip, limit=limit))
+    return split_page(result.all(), keys, limit)
+
+async def count_docs(db: AsyncSession, organization_id: int):
     """
-    Get a list of all documents for a specific organization.
+    Total documents in an organization (estimated for very large ones).
     """
-    return db.query(models.Doc).filter(models.Doc.organization_id == organization_id).offset(skip).limit(limit).all()
+    return await count_for_organization(db, models.Doc, organization_id)
 # ---------------------------
 
-def update_doc(db: Session, doc_id: str, doc_update: schemas.DocUpdate):
+async def update_doc(db: AsyncSession, doc_id: str, doc_update: schemas.DocUpdate):
     """
     Update a document's title, content, icon, or parent.
     """
-    db_doc = get_doc(db, doc_id=doc_id)
+    db_doc = await get_doc(db, doc_id=doc_id)
     if db_doc:
         update_data = doc_update.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_doc, key, value)
-        db.commit()
-        db.refresh(db_doc)
+        await bump_versions_async(db, db_doc.organization_id, DOCS)
+        await db.commit()
+        await db.refresh(db_doc)
     return db_doc
 
-def get_docs_for_user(db: Session, user_id: UUID):
+async def get_docs_by_data_cup_ids(db: AsyncSession, data_cup_ids: Collection[UUID]):
     """
-    Get all documents for a user in a single, optimized query using JOINs.
+    Get all documents from a list of DataCup IDs.
     """
-    return db.query(models.Doc).join(models.DataCup).join(models.TeamRole).filter(models.TeamRole.user_id == user_id).all()
+    if not data_cup_ids:
+        return []
+    result = await db.execute(select(models.Doc).where(models.Doc.data_cup_id.in_(data_cup_ids)))
+    return result.scalars().all()
 
+async def get_docs_for_user(db: AsyncSession, user_id: UUID):
+    """
+    Get all documents in the DataCups the user can access (from the cached access map).
+    """
+    access = await get_access_map_async(db, user_id)
+    return await get_docs_by_data_cup_ids(db, access.data_cups)
 
 
-def delete_doc(db: Session, doc_id: str):
+
+async def delete_doc(db: AsyncSession, doc_id: str):
     """
     Delete a document.
     """
-    db_doc = get_doc(db, doc_id=doc_id)
+    db_doc = await get_doc(db, doc_id=doc_id)
     if db_doc:
-        db.delete(db_doc)
-        db.commit()
-    return db_doc
\ No newline at end of file
+        await db.delete(db_doc)
+        await bump_versions_async(db, db_doc.organization_id, DOCS)
+        await db.commit()
+    return db_doc
@@ -1,70 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from . import crud, schemas
-from ..db.session import get_db
+from ..db.session import get_async_db, get_async_read_db
+from ..db.pagination import set_next_cursor
+from ..db.fieldsets import parse_fields, rows_response
+from ..db.counting import set_total_count
+from ..db.versions import DOCS, HIERARCHY, collection_etag_async, not_modified
 from ..users.crud import get_user_datacups
-from ..auth.security import get_current_user # --- ADD THIS IMPORT ---
+from ..auth.security import get_current_principal
+from ..auth.schemas import Principal
 from .. import models # --- ADD THIS IMPORT ---
 
 router = APIRouter()
 
 # --- MODIFY THIS ENDPOINT ---
 @router.post("/", response_model=schemas.Doc)
-def create_doc(doc: schemas.DocCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def create_doc(doc: schemas.DocCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_principal)):
     """
     Create a new document for the current user's organization.
     """
     doc.organization_id = current_user.organization_id
-    return crud.create_doc(db=db, doc=doc)
+    return await crud.create_doc(db=db, doc=doc)
 # ---------------------------
 
 
 # --- MODIFY THIS ENDPOINT ---
 @router.get("/", response_model=List[schemas.Doc])
-def read_all_docs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def read_all_docs(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: bool = False, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
     """
     Retrieve all documents for the current user's organization.
     """
-    docs = crud.get_all_docs(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
-    return docs
+    selected = parse_fields(fields, schemas.Doc)
+    docs, next_cursor = await crud.get_all_docs(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        set_total_count(response, await crud.count_docs(db, organization_id=current_user.organization_id))
+    return rows_response(docs, schemas.Doc, selected, response)
 
 
 @router.get("/{doc_id}", response_model=schemas.Doc)
-def read_doc(doc_id: str, db: Session = Depends(get_db)):
+async def read_doc(doc_id: str, db: AsyncSession = Depends(get_async_read_db)):
     """
     Retrieve a single document by its ID.
     """
-    db_doc = crud.get_doc(db, doc_id=doc_id)
+    db_doc = await crud.get_doc(db, doc_id=doc_id)
     if db_doc is None:
         raise HTTPException(status_code=404, detail="Document not found")
     return db_doc
 
 @router.get("/my_docs/", response_model=List[schemas.Doc])
-def read_my_docs(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def read_my_docs(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
     """
     Retrieve all documents for the current user from all their DataCups using an optimized query.
     """
-    return crud.get_docs_for_user(db, user_id=current_user.id)
+    etag = await collection_etag_async(db, current_user.organization_id, [DOCS, HIERARCHY], scope=current_user.id)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    return await crud.get_docs_for_user(db, user_id=current_user.id)
 
 @router.put("/{doc_id}", response_model=schemas.Doc)
-def update_doc(doc_id: str, doc: schemas.DocUpdate, db: Session = Depends(get_db)):
+async def update_doc(doc_id: str, doc: schemas.DocUpdate, db: AsyncSession = Depends(get_async_db)):
     """
     Update a document's title, content, icon, or parent.
     """
-    db_doc = crud.update_doc(db, doc_id=doc_id, doc_update=doc)
+    db_doc = await crud.update_doc(db, doc_id=doc_id, doc_update=doc)
     if db_doc is None:
         raise HTTPException(status_code=404, detail="Document not found")
     return db_doc
 
 
 @router.delete("/{doc_id}", response_model=schemas.Doc)
-def delete_doc(doc_id: str, db: Session = Depends(get_db)):
+async def delete_doc(doc_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Delete a document.
     """
-    db_doc = crud.delete_doc(db, doc_id=doc_id)
+    db_doc = await crud.delete_doc(db, doc_id=doc_id)
     if db_doc is None:
         raise HTTPException(status_code=404, detail="Document not found")
     return db_doc
\ No newline at end of file
@@ -1,17 +1,19 @@
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from . import schemas
 from .. import models
+from ..db.pagination import paginate, split_page
+from ..db.fieldsets import row_columns
 
 # --- TimeOffRequest CRUD Functions ---
 
-def create_time_off_request(db: Session, request: schemas.TimeOffRequestCreate):
+def create_time_off_request(db: Session, request: schemas.TimeOffRequestCreate, organization_id: int):
     """
     Create a new time-off request in the database.
     """
-    db_request = models.TimeOffRequest(**request.dict())
+    db_request = models.TimeOffRequest(**request.dict(), organization_id=organization_id)
     db.add(db_request)
     db.commit()
     db.refresh(db_request)
@@ -33,8 +35,10 @@ def get_time_off_requests_for_user(db: Session, user_id: UUID):
 
 # --- MODIFY THIS FUNCTION ---
 # In get_all_time_off_requests function:
-def get_all_time_off_requests(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.TimeOffRequest).join(models.User, models.TimeOffRequest.user_id == models.User.id).filter(models.User.organization_id == organization_id).offset(skip).limit(limit).all()
+def get_all_time_off_requests(db: Session, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    keys = [models.TimeOffRequest.id]
+    query = db.query(*row_columns(models.TimeOffRequest, schemas.TimeOffRequest, fields)).filter(models.TimeOffRequest.organization_id == organization_id)
+    return split_page(paginate(query, keys, cursor=cursor, skip=skip, limit=limit).all(), keys, limit)
 
 def update_time_off_request_status(db: Session, request_id: int, status: models.RequestStatus):
     """
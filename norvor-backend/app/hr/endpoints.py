@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from . import crud, schemas
 from .. import models
-from ..db.session import get_db
+from ..db.session import get_db, get_read_db
+from ..db.pagination import set_next_cursor
+from ..db.fieldsets import parse_fields, rows_response
 from ..users.crud import get_user
-from ..auth.security import get_current_user # --- ADD THIS IMPORT ---
+from ..auth.security import get_current_principal
+from ..auth.schemas import Principal
 
 router = APIRouter()
 
@@ -20,19 +23,21 @@ def create_time_off_request(request: schemas.TimeOffRequestCreate, db: Session =
     if not db_user:
         raise HTTPException(status_code=404, detail=f"User with id {request.user_id} not found")
 
-    return crud.create_time_off_request(db=db, request=request)
+    return crud.create_time_off_request(db=db, request=request, organization_id=db_user.organization_id)
 
 
 # --- MODIFY THIS ENDPOINT ---
 @router.get("/requests/", response_model=List[schemas.TimeOffRequest])
-def read_all_requests(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    requests = crud.get_all_time_off_requests(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
-    return requests
+def read_all_requests(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_read_db), current_user: Principal = Depends(get_current_principal)):
+    selected = parse_fields(fields, schemas.TimeOffRequest)
+    requests, next_cursor = crud.get_all_time_off_requests(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    return rows_response(requests, schemas.TimeOffRequest, selected, response)
 # ---------------------------
 
 
 @router.get("/requests/user/{user_id}", response_model=List[schemas.TimeOffRequest])
-def read_requests_for_user(user_id: UUID, db: Session = Depends(get_db)):
+def read_requests_for_user(user_id: UUID, db: Session = Depends(get_read_db)):
     """
     Retrieve all time-off requests for a specific user.
     """
@@ -1,17 +1,37 @@
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.session import engine
-from app.db.base_class import Base
+from app.db.session import engine, async_engine
+from app.db.routing import read_your_writes
+from app.db.profiling import profile_queries
+from app.db.pagination import NEXT_CURSOR_HEADER
+from app.db.counting import TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER
+from app.core.config import settings
+from app.core.startup import run_startup, startup_timings
+
+# Importing the routers pulls in every model, schema and CRUD module.
+_import_started = time.perf_counter()
 from .api.api_v1 import api_router
+startup_timings["import_routers"] = round((time.perf_counter() - _import_started) * 1000, 2)
+
 
-# This command creates the database tables if they don't exist
-# based on your models.py
-Base.metadata.create_all(bind=engine)
+# Tables are no longer created at import time. The lifespan handler checks the
+# schema revision (or runs create_all when STARTUP_MODE=create_all, for local
+# development), warms the connection pools and reports phase timings.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_startup(app)
+    yield
+    await async_engine.dispose()
+    engine.dispose()
 
 app = FastAPI(
     title="Norvor CRM Backend",
     description="The backend for the Norvor comprehensive CRM platform.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # --- CORS Middleware ---
@@ -24,8 +44,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read pagination metadata and validators sent in response headers.
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER, "ETag"],
 )
 
+# --- Read-Your-Writes Middleware ---
+# Keeps a client on the primary database briefly after it writes, so reads
+# routed to a replica never miss the client's own changes.
+if settings.DATABASE_READ_URL:
+    app.middleware("http")(read_your_writes)
+
+# --- Query Profiling Middleware ---
+# Adds a Server-Timing header with query count and DB time, and logs routes
+# that exceed QUERY_BUDGET or repeat a statement (likely N+1 lazy loads).
+if settings.QUERY_PROFILING:
+    app.middleware("http")(profile_queries)
+
 # --- Include API Routers ---
 # This is the main line that connects your modular endpoints to the app
 app.include_router(api_router, prefix="/api/v1")
@@ -9,7 +9,11 @@ from sqlalchemy import (
     JSON,
     Text,
     DateTime,
-    Boolean
+    Boolean,
+    BigInteger,
+    Index,
+    UniqueConstraint,
+    text
 )
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
@@ -24,6 +28,12 @@ class UserRole(str, enum.Enum):
     MANAGEMENT = "Management"
     EXECUTIVE = "Executive"
 
+class ImportStatus(str, enum.Enum):
+    PENDING = "Pending"
+    RUNNING = "Running"
+    COMPLETED = "Completed"
+    FAILED = "Failed"
+
 class DealStage(str, enum.Enum):
     NEW_LEAD = "New Lead"
     PROPOSAL_SENT = "Proposal Sent"
@@ -92,7 +102,7 @@ class Department(Base):
     __tablename__ = "departments"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, index=True)
-    organization_id = Column(Integer, ForeignKey("organizations.id"))
+    organization_id = Column(Integer, ForeignKey("organizations.id"), index=True)
     immutable = Column(Boolean, default=False)
     
     organization = relationship("Organization", back_populates="departments")
@@ -111,7 +121,7 @@ class Team(Base):
     __tablename__ = "teams"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, index=True)
-    department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"))
+    department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), index=True)
     immutable = Column(Boolean, default=False)
     active = Column(Boolean, default=True)
     team_leader_id = Column(UUID(as_uuid=True), ForeignKey("team_roles.id"), nullable=True)
@@ -125,7 +135,7 @@ class Team(Base):
 class DataBowl(Base):
     __tablename__ = "data_bowls"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id"))
+    team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id"), index=True)
     data_bucket_id = Column(UUID(as_uuid=True), ForeignKey("data_buckets.id"))
     master_owner_team = Column(UUID(as_uuid=True))
 
@@ -136,8 +146,8 @@ class DataBowl(Base):
 class TeamRole(Base):
     __tablename__ = "team_roles"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
-    team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)
+    team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id"), index=True)
     role = Column(String, default="Member")
     
     user = relationship("User", back_populates="team_roles")
@@ -147,8 +157,8 @@ class TeamRole(Base):
 class DataCup(Base):
     __tablename__ = "data_cups"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    data_bowl_id = Column(UUID(as_uuid=True), ForeignKey("data_bowls.id"))
-    team_role_id = Column(UUID(as_uuid=True), ForeignKey("team_roles.id"), nullable=True)
+    data_bowl_id = Column(UUID(as_uuid=True), ForeignKey("data_bowls.id"), index=True)
+    team_role_id = Column(UUID(as_uuid=True), ForeignKey("team_roles.id"), nullable=True, index=True)
     
     data_bowl = relationship("DataBowl", back_populates="data_cups")
     team_role = relationship("TeamRole", back_populates="data_cup")
@@ -159,6 +169,7 @@ class DataCup(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_organization_id_id", "organization_id", "id"),)
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, index=True)
     email = Column(String, unique=True, index=True)
@@ -194,6 +205,9 @@ class User(Base):
 
 class Company(Base):
     __tablename__ = "companies"
+    __table_args__ = (
+        Index("ix_companies_lower_domain", text("lower(domain)")),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     domain = Column(String, nullable=True, unique=True)
@@ -206,14 +220,20 @@ class Company(Base):
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index("ix_contacts_owner_id_id", "owner_id", "id"),
+        Index("ix_contacts_organization_id_id", "organization_id", "id"),
+        Index("ix_contacts_organization_id_lower_email", "organization_id", text("lower(email)")),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)
     email = Column(String, index=True)
     phone = Column(String, nullable=True)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"))
     created_at = Column(Date)
-    data_cup_id = Column(UUID(as_uuid=True), ForeignKey("data_cups.id"))
+    data_cup_id = Column(UUID(as_uuid=True), ForeignKey("data_cups.id"), index=True)
     
     owner = relationship("User", back_populates="owned_contacts")
     company = relationship("Company", back_populates="contacts")
@@ -224,6 +244,10 @@ class Contact(Base):
 
 class Deal(Base):
     __tablename__ = "deals"
+    __table_args__ = (
+        Index("ix_deals_owner_id_id", "owner_id", "id"),
+        Index("ix_deals_organization_id_id", "organization_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     value = Column(Float)
@@ -231,8 +255,9 @@ class Deal(Base):
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)
     contact_id = Column(Integer, ForeignKey("contacts.id"))
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    organization_id = Column(Integer, ForeignKey("organizations.id"))
     close_date = Column(Date)
-    data_cup_id = Column(UUID(as_uuid=True), ForeignKey("data_cups.id"))
+    data_cup_id = Column(UUID(as_uuid=True), ForeignKey("data_cups.id"), index=True)
 
     company = relationship("Company", back_populates="deals")
     contact = relationship("Contact", back_populates="deals")
@@ -242,11 +267,16 @@ class Deal(Base):
 
 class CrmTask(Base):
     __tablename__ = "crm_tasks"
+    __table_args__ = (
+        Index("ix_crm_tasks_owner_id_id", "owner_id", "id"),
+        Index("ix_crm_tasks_organization_id_id", "organization_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     due_date = Column(DateTime)
     status = Column(Enum(CrmTaskStatus), default=CrmTaskStatus.NOT_STARTED)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    organization_id = Column(Integer, ForeignKey("organizations.id"))
     contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=True)
     deal_id = Column(Integer, ForeignKey("deals.id"), nullable=True)
 
@@ -256,27 +286,37 @@ class CrmTask(Base):
 
 class Activity(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        Index("ix_activities_user_id_id", "user_id", "id"),
+        Index("ix_activities_organization_id_id", "organization_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     type = Column(Enum(ActivityType))
     notes = Column(Text, nullable=True)
     date = Column(Date)
     contact_id = Column(Integer, ForeignKey("contacts.id"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    organization_id = Column(Integer, ForeignKey("organizations.id"))
 
     contact = relationship("Contact", back_populates="activities")
     user = relationship("User", back_populates="logged_activities")
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_manager_id_id", "manager_id", "id"),
+        Index("ix_projects_organization_id_id", "organization_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     manager_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    organization_id = Column(Integer, ForeignKey("organizations.id"))
     status = Column(Enum(ProjectStatus))
     progress = Column(Integer)
     start_date = Column(Date)
     end_date = Column(Date)
     member_ids = Column(JSON, default=[])
-    data_cup_id = Column(UUID(as_uuid=True), ForeignKey("data_cups.id"))
+    data_cup_id = Column(UUID(as_uuid=True), ForeignKey("data_cups.id"), index=True)
     
     manager = relationship("User", back_populates="projects")
     tasks = relationship("Task", back_populates="project")
@@ -285,12 +325,17 @@ class Project(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_assignee_id_id", "assignee_id", "id"),
+        Index("ix_tasks_organization_id_id", "organization_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     description = Column(String, nullable=True)
     status = Column(Enum(TaskStatus))
     assignee_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"))
     due_date = Column(Date)
     
     project = relationship("Project", back_populates="tasks")
@@ -298,8 +343,13 @@ class Task(Base):
 
 class TimeOffRequest(Base):
     __tablename__ = "time_off_requests"
+    __table_args__ = (
+        Index("ix_time_off_requests_user_id_id", "user_id", "id"),
+        Index("ix_time_off_requests_organization_id_id", "organization_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    organization_id = Column(Integer, ForeignKey("organizations.id"))
     type = Column(Enum(LeaveType))
     start_date = Column(Date)
     end_date = Column(Date)
@@ -310,13 +360,14 @@ class TimeOffRequest(Base):
 
 class Doc(Base):
     __tablename__ = "docs"
+    __table_args__ = (Index("ix_docs_organization_id_id", "organization_id", "id"),)
     id = Column(String, primary_key=True, index=True)
-    parent_id = Column(String, ForeignKey("docs.id"), nullable=True)
+    parent_id = Column(String, ForeignKey("docs.id"), nullable=True, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"))
     title = Column(String)
     icon = Column(String, nullable=True, default="📄")
     content = Column(Text, nullable=True, default="")
-    data_cup_id = Column(UUID(as_uuid=True), ForeignKey("data_cups.id"))
+    data_cup_id = Column(UUID(as_uuid=True), ForeignKey("data_cups.id"), index=True)
     
     parent = relationship("Doc", remote_side=[id], back_populates="children")
     children = relationship("Doc", back_populates="parent")
@@ -325,12 +376,77 @@ class Doc(Base):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_team_id_id", "team_id", "id"),
+        Index("ix_tickets_submitted_by_id", "submitted_by", "id"),
+        Index("ix_tickets_organization_id_id", "organization_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(Text, nullable=True)
     status = Column(Enum(TicketStatus), default=TicketStatus.OPEN)
     submitted_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    organization_id = Column(Integer, ForeignKey("organizations.id"))
     team_id = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     submitter = relationship("User", back_populates="submitted_tickets")
+
+
+class CollectionVersion(Base):
+    """
+    A counter per organization and collection, bumped in the same transaction
+    as every write to that collection. Used to build ETags for polled reads.
+    """
+    __tablename__ = "collection_versions"
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    collection = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class UserImportJob(Base):
+    """
+    A bulk user import running in the background, with its progress so far.
+    `errors` holds one {"row", "email", "error"} entry per rejected row.
+    """
+    __tablename__ = "user_import_jobs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), index=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    status = Column(Enum(ImportStatus), default=ImportStatus.PENDING)
+    total = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    created = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    errors = Column(JSON, default=list)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class DealSummary(Base):
+    """
+    Deal count and total value per organization, stage and one reported
+    dimension, kept current by every deal write (see crm/analytics.py).
+    `dimension` is "owner" (owner_id set), "company" (company_id set) or a
+    close-date bucket, "week", "month" or "quarter" (close_date set to the
+    bucket's first day). Each deal is counted once per dimension, so the row
+    count is bounded by the number of owners, companies and buckets, not by
+    the number of deals.
+    """
+    __tablename__ = "deal_summaries"
+    __table_args__ = (
+        # NULL owners, companies, stages and close dates form groups of their own.
+        UniqueConstraint(
+            "organization_id", "dimension", "stage", "owner_id", "company_id", "close_date",
+            name="uq_deal_summaries_group", postgresql_nulls_not_distinct=True,
+        ),
+    )
+    id = Column(BigInteger, primary_key=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    dimension = Column(String, nullable=False)
+    stage = Column(Enum(DealStage))
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    company_id = Column(Integer, ForeignKey("companies.id"))
+    close_date = Column(Date)
+    deal_count = Column(Integer, nullable=False, default=0)
+    total_value = Column(Float, nullable=False, default=0)
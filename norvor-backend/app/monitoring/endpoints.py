@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..db.metrics import pool_snapshot
+from ..db.profiling import route_snapshot
+from ..core.startup import startup_timings
+from ..core.cache import response_cache
+from ..core.config import settings
+from ..auth.security import get_current_principal
+from ..auth.schemas import Principal
+
+
+def require_operator(current_user: Principal = Depends(get_current_principal)) -> Principal:
+    """
+    Monitoring data spans every tenant served by the worker, so it is limited
+    to the operators listed in MONITORING_ALLOWED_EMAILS.
+    """
+    if current_user.email.lower() not in settings.MONITORING_ALLOWED_EMAILS:
+        raise HTTPException(status_code=403, detail="Not authorized for this action")
+    return current_user
+
+
+router = APIRouter(dependencies=[Depends(require_operator)])
+
+@router.get("/db-pool")
+def read_db_pool_metrics():
+    """
+    Connection pool metrics for the worker that serves this request.
+    Counters are per process; scrape every worker to size pools across a fleet.
+    """
+    return pool_snapshot()
+
+@router.get("/queries")
+def read_query_metrics():
+    """
+    Per-route query counts and DB time recorded by the profiling middleware in this worker.
+    """
+    return route_snapshot()
+
+@router.get("/startup")
+def read_startup_timings():
+    """
+    How long each startup phase took in this worker, in milliseconds.
+    """
+    return startup_timings
+
+@router.get("/cache")
+def read_cache_metrics():
+    """
+    Response cache backend and per-namespace hit rates in this worker.
+    """
+    return response_cache.snapshot()
@@ -1,6 +1,9 @@
 from sqlalchemy.orm import Session
 from .. import models
 from . import schemas
+from ..auth.principals import invalidate_organization
+from ..core.cache import response_cache
+from ..db.versions import ORGANIZATION, bump_versions, collection_versions
 
 def get_organization(db: Session, org_id: int):
     """
@@ -8,6 +11,16 @@ def get_organization(db: Session, org_id: int):
     """
     return db.query(models.Organization).filter(models.Organization.id == org_id).first()
 
+def get_organization_json(db: Session, org_id: int) -> bytes:
+    """
+    The organization as response JSON, cached per organization version so
+    every worker agrees on when an entry is stale.
+    """
+    version = collection_versions(db, org_id, [ORGANIZATION])[ORGANIZATION]
+    def load():
+        return schemas.Organization.model_validate(get_organization(db, org_id=org_id)).model_dump_json().encode()
+    return response_cache.get_or_load("organization", org_id, (version,), load)
+
 def complete_onboarding(db: Session, org_id: int):
     """
     Mark an organization's onboarding as complete.
@@ -15,7 +28,10 @@ def complete_onboarding(db: Session, org_id: int):
     db_org = get_organization(db, org_id=org_id)
     if db_org:
         db_org.has_completed_onboarding = True
+        bump_versions(db, org_id, ORGANIZATION)
         db.commit()
+        invalidate_organization(org_id)
+        response_cache.invalidate(org_id)
         db.refresh(db_org)
     return db_org
 
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from . import crud, schemas
 from ..db.session import get_db
+from ..core.responses import json_body_response
 from ..auth.security import get_current_user
 from .. import models
 
@@ -11,6 +12,13 @@ router = APIRouter()
 
 # ------------------------------------
 
+@router.get("/me", response_model=schemas.Organization)
+def read_my_organization(response: Response, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """
+    Get the current user's organization.
+    """
+    return json_body_response(crud.get_organization_json(db, org_id=current_user.organization_id), response)
+
 @router.post("/complete_onboarding", response_model=schemas.Organization)
 def complete_organization_onboarding(
     db: Session = Depends(get_db),
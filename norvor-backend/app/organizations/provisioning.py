@@ -0,0 +1,95 @@
+import uuid
+from typing import Dict, NamedTuple, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+
+from .. import models
+from ..core.config import settings
+
+# --- Organization Provisioning ---
+# Signup creates a tenant from a template: its departments, each with a data
+# bucket, and their teams, each with a data bowl. The signing-up executive
+# joins the template's owner teams with a DataCup. Ids are generated here, so
+# the whole skeleton goes in as one multi-row INSERT per table inside a single
+# transaction: either the tenant exists completely or not at all.
+
+
+class TeamTemplate(NamedTuple):
+    name: str
+    tools: Tuple[models.Tool, ...] = ()
+    immutable: bool = False
+    # Add the signing-up executive to this team (as "Lead").
+    owner_joins: bool = False
+
+
+class DepartmentTemplate(NamedTuple):
+    name: str
+    teams: Tuple[TeamTemplate, ...] = ()
+    immutable: bool = False
+
+
+DEFAULT_TEMPLATE = (
+    DepartmentTemplate(
+        name="Human Resources",
+        immutable=True,
+        teams=(TeamTemplate(name="HR", tools=(models.Tool.HR, models.Tool.DOCS), immutable=True, owner_joins=True),),
+    ),
+)
+
+# Templates selectable by name (SIGNUP_TEMPLATE); register more here.
+TEMPLATES: Dict[str, Tuple[DepartmentTemplate, ...]] = {"default": DEFAULT_TEMPLATE}
+
+
+def provision_organization(
+    db: Session,
+    organization_name: str,
+    executive: dict,
+    template: Tuple[DepartmentTemplate, ...] = None,
+) -> models.User:
+    """
+    Create an organization, its template skeleton and its first (executive)
+    user in one transaction. `executive` holds the User column values
+    (including `hashed_password`). Returns the user with its organization loaded.
+    """
+    if template is None:
+        template = TEMPLATES[settings.SIGNUP_TEMPLATE]
+    user_id = uuid.uuid4()
+    departments, buckets, teams, bowls, roles, cups = [], [], [], [], [], []
+    for department in template:
+        department_id, bucket_id = uuid.uuid4(), uuid.uuid4()
+        departments.append({"id": department_id, "name": department.name, "immutable": department.immutable})
+        buckets.append({"id": bucket_id, "department_id": department_id})
+        for team in department.teams:
+            team_id, bowl_id = uuid.uuid4(), uuid.uuid4()
+            teams.append({"id": team_id, "name": team.name, "department_id": department_id, "immutable": team.immutable, "active": True, "tools": list(team.tools)})
+            bowls.append({"id": bowl_id, "team_id": team_id, "data_bucket_id": bucket_id, "master_owner_team": team_id})
+            if team.owner_joins:
+                role_id = uuid.uuid4()
+                roles.append({"id": role_id, "user_id": user_id, "team_id": team_id, "role": "Lead"})
+                cups.append({"id": uuid.uuid4(), "data_bowl_id": bowl_id, "team_role_id": role_id})
+
+    try:
+        organization_id = db.execute(
+            insert(models.Organization).values(name=organization_name).returning(models.Organization.id)
+        ).scalar_one()
+        for row in departments:
+            row["organization_id"] = organization_id
+        db.execute(insert(models.User).values(id=user_id, organization_id=organization_id, role=models.UserRole.EXECUTIVE, **executive))
+        for model, rows in (
+            (models.Department, departments),
+            (models.DataBucket, buckets),
+            (models.Team, teams),
+            (models.DataBowl, bowls),
+            (models.TeamRole, roles),
+            (models.DataCup, cups),
+        ):
+            if rows:
+                db.execute(insert(model), rows)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Organization name or email already registered")
+    return db.query(models.User).options(joinedload(models.User.organization)).filter(models.User.id == user_id).one()
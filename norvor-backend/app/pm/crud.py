@@ -1,63 +1,105 @@
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Collection, List, Optional
 
 from . import schemas
 from .. import models
+from ..db.pagination import paginate, split_page
+from ..db.fieldsets import load_only_fields, row_columns
+from ..db.counting import count_for_organization
+from ..db.versions import PROJECTS, bump_versions_async
+from ..teams.access import get_access_map_async
 from uuid import UUID
 
+# Projects are always returned with their tasks, which an AsyncSession cannot
+# lazy load during serialization, so every project query loads them up front.
+_with_tasks = selectinload(models.Project.tasks)
+
 # --- Project CRUD Functions ---
 
-def create_project(db: Session, project: schemas.ProjectCreate):
+async def create_project(db: AsyncSession, project: schemas.ProjectCreate, organization_id: int):
     """
     Create a new project.
     """
-    db_project = models.Project(**project.dict())
+    db_project = models.Project(**project.dict(), organization_id=organization_id)
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    await bump_versions_async(db, organization_id, PROJECTS)
+    await db.commit()
+    await db.refresh(db_project, attribute_names=["tasks"])
     return db_project
 
-def get_project(db: Session, project_id: int):
+async def get_project(db: AsyncSession, project_id: int):
     """
     Get a single project by its ID.
     """
-    return db.query(models.Project).filter(models.Project.id == project_id).first()
+    result = await db.execute(select(models.Project).options(_with_tasks).where(models.Project.id == project_id))
+    return result.scalars().first()
 
 
 # --- Task CRUD Functions ---
 
-def create_task(db: Session, task: schemas.TaskCreate):
+async def create_task(db: AsyncSession, task: schemas.TaskCreate, organization_id: int):
     """
     Create a new task for a project.
     """
-    db_task = models.Task(**task.dict())
+    db_task = models.Task(**task.dict(), organization_id=organization_id)
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    # Projects are served with their tasks, so a new task changes the projects collection.
+    await bump_versions_async(db, organization_id, PROJECTS)
+    await db.commit()
+    await db.refresh(db_task)
     return db_task
 
-def get_projects_by_data_cup_ids(db: Session, data_cup_ids: List[UUID]):
+async def get_projects_by_data_cup_ids(db: AsyncSession, data_cup_ids: Collection[UUID]):
     """
     Get all projects from a list of DataCup IDs.
     """
-    return db.query(models.Project).filter(models.Project.data_cup_id.in_(data_cup_ids)).all()
+    if not data_cup_ids:
+        return []
+    result = await db.execute(select(models.Project).options(_with_tasks).where(models.Project.data_cup_id.in_(data_cup_ids)))
+    return result.scalars().all()
 
-def get_projects_for_user(db: Session, user_id: UUID):
+async def get_projects_for_user(db: AsyncSession, user_id: UUID):
     """
-    Get all projects for a user in a single, optimized query using JOINs.
+    Get all projects in the DataCups the user can access (from the cached access map).
     """
-    return db.query(models.Project).join(models.DataCup).join(models.TeamRole).filter(models.TeamRole.user_id == user_id).all()
+    access = await get_access_map_async(db, user_id)
+    return await get_projects_by_data_cup_ids(db, access.data_cups)
 
 
-def get_tasks_for_project(db: Session, project_id: int):
+async def get_tasks_for_project(db: AsyncSession, project_id: int):
     """
     Get all tasks associated with a specific project.
     """
-    return db.query(models.Task).filter(models.Task.project_id == project_id).all()
+    result = await db.execute(select(models.Task).where(models.Task.project_id == project_id))
+    return result.scalars().all()
 # In get_projects function:
-def get_projects(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Project).join(models.User, models.Project.manager_id == models.User.id).filter(models.User.organization_id == organization_id).offset(skip).limit(limit).all()
+async def get_projects(db: AsyncSession, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    keys = [models.Project.id]
+    query = select(models.Project).where(models.Project.organization_id == organization_id)
+    if fields:
+        query = query.options(load_only_fields(models.Project, fields))
+    if not fields or "tasks" in fields:
+        query = query.options(_with_tasks)
+    result = await db.execute(paginate(query, keys, cursor=cursor, skip=skip, limit=limit))
+    return split_page(result.scalars().all(), keys, limit)
+
+async def count_projects(db: AsyncSession, organization_id: int):
+    return await count_for_organization(db, models.Project, organization_id)
 
 # In get_all_tasks function:
-def get_all_tasks(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Task).join(models.User, models.Task.assignee_id == models.User.id).filter(models.User.organization_id == organization_id).offset(skip).limit(limit).all()
\ No newline at end of file
+def tasks_query(organization_id: int, fields: Optional[List[str]] = None):
+    """
+    Core select of an organization's tasks shared by the list and export endpoints.
+    """
+    return select(*row_columns(models.Task, schemas.Task, fields)).where(models.Task.organization_id == organization_id)
+
+async def get_all_tasks(db: AsyncSession, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    keys = [models.Task.id]
+    query = tasks_query(organization_id, fields)
+    result = await db.execute(paginate(query, keys, cursor=cursor, skip=skip, limit=limit))
+    return split_page(result.all(), keys, limit)
+
+async def count_tasks(db: AsyncSession, organization_id: int):
+    return await count_for_organization(db, models.Task, organization_id)
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 
 from . import crud, schemas
-from ..db.session import get_db
-from ..users.crud import get_user
+from ..db.session import get_async_db, get_async_read_db
+from ..db.pagination import set_next_cursor
+from ..db.export import ExportFormat, export_response
+from ..db.fieldsets import parse_fields, sparse_response, rows_response
+from ..db.counting import set_total_count
+from ..db.versions import PROJECTS, HIERARCHY, collection_etag_async, not_modified
+from ..users.crud import get_user_async
 from ..users.crud import get_user_datacups
-from ..auth.security import get_current_user
+from ..auth.security import get_current_principal
+from ..auth.schemas import Principal
 from .. import models
 
 router = APIRouter()
@@ -15,30 +22,36 @@ router = APIRouter()
 # --- Project Endpoints ---
 
 @router.post("/projects/", response_model=schemas.Project)
-def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
+async def create_project(project: schemas.ProjectCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new project.
     """
-    db_manager = get_user(db, user_id=project.manager_id)
+    db_manager = await get_user_async(db, user_id=project.manager_id)
     if not db_manager:
         raise HTTPException(status_code=404, detail=f"Manager with id {project.manager_id} not found")
 
-    return crud.create_project(db=db, project=project)
+    return await crud.create_project(db=db, project=project, organization_id=db_manager.organization_id)
 
 @router.get("/projects/", response_model=List[schemas.Project])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def read_projects(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: bool = False, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
     """
     Retrieve all projects for the current user's organization.
     """
-    projects = crud.get_projects(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
+    selected = parse_fields(fields, schemas.Project)
+    projects, next_cursor = await crud.get_projects(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        set_total_count(response, await crud.count_projects(db, organization_id=current_user.organization_id))
+    if selected:
+        return sparse_response(projects, schemas.Project, selected, response)
     return projects
 
 @router.get("/projects/{project_id}", response_model=schemas.Project)
-def read_project(project_id: int, db: Session = Depends(get_db)):
+async def read_project(project_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """
     Retrieve a single project by its ID.
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = await crud.get_project(db, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     return db_project
@@ -46,33 +59,49 @@ def read_project(project_id: int, db: Session = Depends(get_db)):
 # --- Task Endpoints ---
 
 @router.get("/my_projects/", response_model=List[schemas.Project])
-def read_my_projects(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def read_my_projects(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
     """
     Retrieve all projects for the current user from all their DataCups using an optimized query.
     """
-    return crud.get_projects_for_user(db, user_id=current_user.id)
+    etag = await collection_etag_async(db, current_user.organization_id, [PROJECTS, HIERARCHY], scope=current_user.id)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    return await crud.get_projects_for_user(db, user_id=current_user.id)
 
 @router.post("/tasks/", response_model=schemas.Task)
-def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db)):
+async def create_task(task: schemas.TaskCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new task for a project.
     """
-    db_project = crud.get_project(db, project_id=task.project_id)
+    db_project = await crud.get_project(db, project_id=task.project_id)
     if not db_project:
         raise HTTPException(status_code=404, detail=f"Project with id {task.project_id} not found")
 
-    db_assignee = get_user(db, user_id=task.assignee_id)
+    db_assignee = await get_user_async(db, user_id=task.assignee_id)
     if not db_assignee:
         raise HTTPException(status_code=404, detail=f"Assignee with id {task.assignee_id} not found")
 
-    return crud.create_task(db=db, task=task)
+    return await crud.create_task(db=db, task=task, organization_id=db_project.organization_id)
 
 
 
 @router.get("/tasks/", response_model=List[schemas.Task])
-def read_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def read_tasks(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: bool = False, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db), current_user: Principal = Depends(get_current_principal)):
     """
     Retrieve all tasks for the current user's organization.
     """
-    tasks = crud.get_all_tasks(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
-    return tasks
\ No newline at end of file
+    selected = parse_fields(fields, schemas.Task)
+    tasks, next_cursor = await crud.get_all_tasks(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        set_total_count(response, await crud.count_tasks(db, organization_id=current_user.organization_id))
+    return rows_response(tasks, schemas.Task, selected, response)
+
+@router.get("/tasks/export", response_class=StreamingResponse)
+async def export_tasks(request: Request, format: ExportFormat = "ndjson", current_user: Principal = Depends(get_current_principal)):
+    """
+    Stream every task in the current user's organization as NDJSON or CSV.
+    """
+    query = crud.tasks_query(current_user.organization_id).order_by(models.Task.id)
+    return export_response(request, query, schemas.Task.model_fields, format, "tasks")
@@ -1,16 +1,20 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from . import schemas
 from .. import models
+from ..db.pagination import paginate, split_page
+from ..db.fieldsets import row_columns
 
-def create_ticket(db: Session, ticket: schemas.TicketCreate):
+def create_ticket(db: Session, ticket: schemas.TicketCreate, organization_id: int):
     """
     Create a new ticket in the database.
     """
     db_ticket = models.Ticket(
         **ticket.dict(),
+        organization_id=organization_id,
         created_at=datetime.utcnow(),
         status=models.TicketStatus.OPEN
     )
@@ -25,11 +29,13 @@ def get_ticket(db: Session, ticket_id: int):
     """
     return db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
 
-def get_tickets_by_team(db: Session, team_id: str, skip: int = 0, limit: int = 100):
+def get_tickets_by_team(db: Session, team_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
     """
-    Get all tickets for a specific team.
+    Get one page of tickets for a specific team, plus the cursor of the next page.
     """
-    return db.query(models.Ticket).filter(models.Ticket.team_id == team_id).offset(skip).limit(limit).all()
+    keys = [models.Ticket.id]
+    query = db.query(*row_columns(models.Ticket, schemas.Ticket, fields)).filter(models.Ticket.team_id == team_id)
+    return split_page(paginate(query, keys, cursor=cursor, skip=skip, limit=limit).all(), keys, limit)
 
 def update_ticket_status(db: Session, ticket_id: int, status: models.TicketStatus):
     """
@@ -42,10 +48,18 @@ def update_ticket_status(db: Session, ticket_id: int, status: models.TicketStatu
         db.refresh(db_ticket)
     return db_ticket
 
+def tickets_query(organization_id: int, fields: Optional[List[str]] = None):
+    """
+    Core select of an organization's tickets shared by the list and export endpoints.
+    """
+    return select(*row_columns(models.Ticket, schemas.Ticket, fields)).where(models.Ticket.organization_id == organization_id)
+
 # --- MODIFY THIS FUNCTION ---
-def get_all_tickets(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
+def get_all_tickets(db: Session, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
     """
-    Get a list of all tickets for a specific organization.
+    Get one page of tickets for a specific organization, plus the cursor of the next page.
     """
-    return db.query(models.Ticket).join(models.User, models.Ticket.submitted_by == models.User.id).filter(models.User.organization_id == organization_id).offset(skip).limit(limit).all()
+    keys = [models.Ticket.id]
+    query = paginate(tickets_query(organization_id, fields), keys, cursor=cursor, skip=skip, limit=limit)
+    return split_page(db.execute(query).all(), keys, limit)
 # --------------------------
\ No newline at end of file
@@ -1,25 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID # --- ADD THIS IMPORT ---
 
 from . import crud, schemas
 from .. import models
-from ..db.session import get_db
+from ..db.session import get_db, get_read_db
+from ..db.pagination import set_next_cursor
+from ..db.export import ExportFormat, export_response
+from ..db.fieldsets import parse_fields, rows_response
 from ..users.crud import get_user
-from ..auth.security import get_current_user # --- ADD THIS IMPORT ---
+from ..auth.security import get_current_principal
+from ..auth.schemas import Principal
 
 router = APIRouter()
 
 
 # --- MODIFY THIS ENDPOINT ---
 @router.get("/tickets/", response_model=List[schemas.Ticket]) 
-def read_all_tickets(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def read_all_tickets(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_read_db), current_user: Principal = Depends(get_current_principal)):
     """
     Retrieve all tickets for the current user's organization.
     """
-    tickets = crud.get_all_tickets(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
-    return tickets
+    selected = parse_fields(fields, schemas.Ticket)
+    tickets, next_cursor = crud.get_all_tickets(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    return rows_response(tickets, schemas.Ticket, selected, response)
+
+@router.get("/tickets/export", response_class=StreamingResponse)
+async def export_tickets(request: Request, format: ExportFormat = "ndjson", current_user: Principal = Depends(get_current_principal)):
+    """
+    Stream every ticket in the current user's organization as NDJSON or CSV.
+    """
+    query = crud.tickets_query(current_user.organization_id).order_by(models.Ticket.id)
+    return export_response(request, query, schemas.Ticket.model_fields, format, "tickets")
 
 
 # --- MODIFY THIS ENDPOINT ---
@@ -33,17 +48,19 @@ def create_ticket(ticket: schemas.TicketCreate, db: Session = Depends(get_db)):
     if not db_user:
         raise HTTPException(status_code=404, detail=f"User with id {ticket.submitted_by} not found")
 
-    return crud.create_ticket(db=db, ticket=ticket)
+    return crud.create_ticket(db=db, ticket=ticket, organization_id=db_user.organization_id)
 # ---------------------------
 
 
 @router.get("/tickets/team/{team_id}", response_model=List[schemas.Ticket])
-def read_tickets_for_team(team_id: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_tickets_for_team(team_id: str, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_read_db)):
     """
     Retrieve all tickets for a specific team.
     """
-    tickets = crud.get_tickets_by_team(db, team_id=team_id, skip=skip, limit=limit)
-    return tickets
+    selected = parse_fields(fields, schemas.Ticket)
+    tickets, next_cursor = crud.get_tickets_by_team(db, team_id=team_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    return rows_response(tickets, schemas.Ticket, selected, response)
 
 
 @router.patch("/tickets/{ticket_id}/status", response_model=schemas.Ticket)
@@ -57,4 +74,4 @@ def update_ticket_status(ticket_id: int, status_update: schemas.TicketUpdate, db
     db_ticket = crud.update_ticket_status(db, ticket_id=ticket_id, status=status_update.status)
     if db_ticket is None:
         raise HTTPException(status_code=404, detail="Ticket not found")
-    return db_ticket
\ No newline at end of file
+    return db_ticket
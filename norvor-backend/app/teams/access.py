@@ -0,0 +1,80 @@
+from typing import FrozenSet, NamedTuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..db.versions import HIERARCHY
+
+# --- User -> DataCup Access Map ---
+# Which DataCups a user can read (one per team role), plus the bowls and
+# buckets above them, resolved in one query and cached per user. The my_*
+# reads filter on `data_cup_id IN (...)` instead of joining through
+# team_roles on every dashboard load. Each entry remembers the organization's
+# HIERARCHY version it was built from; every lookup reads the current version
+# (one indexed lookup) and rebuilds the map when it moved, so a role change
+# committed on any worker takes effect everywhere on the next request.
+
+_access_maps = TTLCache(
+    maxsize=settings.ACCESS_MAP_CACHE_SIZE,
+    ttl=settings.ACCESS_MAP_CACHE_TTL_SECONDS,
+)
+
+
+class AccessMap(NamedTuple):
+    data_cups: FrozenSet[UUID]
+    data_bowls: FrozenSet[UUID]
+    data_buckets: FrozenSet[UUID]
+
+
+def _access_query(user_id: UUID):
+    return (
+        select(models.DataCup.id, models.DataCup.data_bowl_id, models.DataBowl.data_bucket_id)
+        .join(models.TeamRole, models.DataCup.team_role_id == models.TeamRole.id)
+        .outerjoin(models.DataBowl, models.DataCup.data_bowl_id == models.DataBowl.id)
+        .where(models.TeamRole.user_id == user_id)
+    )
+
+
+def _version_query(user_id: UUID):
+    organization_id = select(models.User.organization_id).where(models.User.id == user_id).scalar_subquery()
+    return select(models.CollectionVersion.version).where(
+        models.CollectionVersion.organization_id == organization_id,
+        models.CollectionVersion.collection == HIERARCHY,
+    )
+
+
+def _access_map(rows) -> AccessMap:
+    return AccessMap(
+        data_cups=frozenset(row[0] for row in rows),
+        data_bowls=frozenset(row[1] for row in rows if row[1] is not None),
+        data_buckets=frozenset(row[2] for row in rows if row[2] is not None),
+    )
+
+
+def get_access_map(db: Session, user_id: UUID) -> AccessMap:
+    version = db.execute(_version_query(user_id)).scalar() or 0
+    cached = _access_maps.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    access = _access_map(db.execute(_access_query(user_id)).all())
+    _access_maps.set(user_id, (version, access))
+    return access
+
+
+async def get_access_map_async(db: AsyncSession, user_id: UUID) -> AccessMap:
+    version = (await db.execute(_version_query(user_id))).scalar() or 0
+    cached = _access_maps.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    access = _access_map((await db.execute(_access_query(user_id))).all())
+    _access_maps.set(user_id, (version, access))
+    return access
+
+
+def invalidate_access(user_id: UUID) -> None:
+    _access_maps.delete(user_id)
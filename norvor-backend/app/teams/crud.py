@@ -1,7 +1,33 @@
-from sqlalchemy.orm import Session, joinedload
+import uuid
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List
 from uuid import UUID
 from . import schemas
 from .. import models
+from ..core.cache import response_cache
+from ..db.versions import HIERARCHY, bump_versions
+from .access import invalidate_access
+
+_departments = TypeAdapter(List[schemas.Department])
+_hierarchy_snapshot = TypeAdapter(schemas.HierarchySnapshot)
+
+# Everything schemas.Department serializes, one SELECT ... IN per level (per
+# 500 parent rows), so the query count does not grow with teams and members.
+_with_team_members = (
+    selectinload(models.Team.team_roles).selectinload(models.TeamRole.user),
+    selectinload(models.Team.team_roles).selectinload(models.TeamRole.data_cup),
+    selectinload(models.Team.data_bowl).selectinload(models.DataBowl.data_cups),
+)
+_with_hierarchy = (
+    selectinload(models.Department.teams).options(*_with_team_members),
+    selectinload(models.Department.data_bucket).selectinload(models.DataBucket.data_bowls).selectinload(models.DataBowl.data_cups),
+)
+_teams = TypeAdapter(List[schemas.Team])
+
+def _team_org_id(db: Session, team_id: UUID):
+    return db.query(models.Department.organization_id).join(models.Team).filter(models.Team.id == team_id).scalar()
 
 # ===================================================================
 # Department CRUD
@@ -10,7 +36,27 @@ def get_department(db: Session, department_id: UUID):
     return db.query(models.Department).options(joinedload(models.Department.teams), joinedload(models.Department.data_bucket)).filter(models.Department.id == department_id).first()
 
 def get_departments_by_org(db: Session, org_id: int):
-    return db.query(models.Department).filter(models.Department.organization_id == org_id).options(joinedload(models.Department.teams), joinedload(models.Department.data_bucket)).all()
+    return db.query(models.Department).filter(models.Department.organization_id == org_id).options(*_with_hierarchy).all()
+
+def get_departments_by_org_json(db: Session, org_id: int, version: int) -> bytes:
+    """
+    The organization's departments as response JSON. Cached per hierarchy
+    `version`, so the body always matches an ETag built from that version.
+    """
+    def load():
+        return _departments.dump_json(_departments.validate_python(get_departments_by_org(db, org_id), from_attributes=True))
+    return response_cache.get_or_load("departments", org_id, (version,), load)
+
+def get_hierarchy_snapshot_json(db: Session, org_id: int, version: int) -> bytes:
+    """
+    The organization's full Department -> Team -> TeamRole -> User/DataCup tree
+    as response JSON. Cached per hierarchy `version`, so every worker agrees on
+    when a snapshot is stale.
+    """
+    def load():
+        snapshot = {"organization_id": org_id, "version": version, "departments": get_departments_by_org(db, org_id)}
+        return _hierarchy_snapshot.dump_json(_hierarchy_snapshot.validate_python(snapshot, from_attributes=True))
+    return response_cache.get_or_load("hierarchy", org_id, (version,), load)
 
 def create_department(db: Session, department: schemas.DepartmentCreate, org_id: int):
     db_department = models.Department(**department.dict(), organization_id=org_id)
@@ -18,7 +64,9 @@ def create_department(db: Session, department: schemas.DepartmentCreate, org_id:
     db.flush()
     db_bucket = models.DataBucket(department_id=db_department.id)
     db.add(db_bucket)
+    bump_versions(db, org_id, HIERARCHY)
     db.commit()
+    response_cache.invalidate(org_id)
     db.refresh(db_department)
     return db_department
 
@@ -27,15 +75,20 @@ def update_department(db: Session, department_id: UUID, department_update: schem
     if db_department:
         if department_update.name is not None:
             db_department.name = department_update.name
+        bump_versions(db, db_department.organization_id, HIERARCHY)
         db.commit()
+        response_cache.invalidate(db_department.organization_id)
         db.refresh(db_department)
     return db_department
 
 def delete_department(db: Session, department_id: UUID):
     db_department = get_department(db, department_id)
     if db_department and not db_department.teams and not db_department.immutable:
+        org_id = db_department.organization_id
         db.delete(db_department)
+        bump_versions(db, org_id, HIERARCHY)
         db.commit()
+        response_cache.invalidate(org_id)
         return db_department
     return None
 
@@ -46,7 +99,15 @@ def get_team(db: Session, team_id: UUID):
     return db.query(models.Team).options(joinedload(models.Team.team_roles).joinedload(models.TeamRole.user), joinedload(models.Team.data_bowl)).filter(models.Team.id == team_id).first()
 
 def get_teams_by_org(db: Session, org_id: int):
-    return db.query(models.Team).join(models.Department).filter(models.Department.organization_id == org_id).all()
+    return db.query(models.Team).join(models.Department).filter(models.Department.organization_id == org_id).options(*_with_team_members).all()
+
+def get_teams_by_org_json(db: Session, org_id: int, version: int) -> bytes:
+    """
+    The organization's teams as response JSON, cached per hierarchy `version`.
+    """
+    def load():
+        return _teams.dump_json(_teams.validate_python(get_teams_by_org(db, org_id), from_attributes=True))
+    return response_cache.get_or_load("teams", org_id, (version,), load)
 
 def create_team(db: Session, team: schemas.TeamCreate):
     bucket = db.query(models.DataBucket).filter(models.DataBucket.department_id == team.department_id).first()
@@ -56,7 +117,10 @@ def create_team(db: Session, team: schemas.TeamCreate):
     db.flush()
     db_bowl = models.DataBowl(team_id=db_team.id, data_bucket_id=bucket.id, master_owner_team=db_team.id)
     db.add(db_bowl)
+    org_id = _team_org_id(db, db_team.id)
+    bump_versions(db, org_id, HIERARCHY)
     db.commit()
+    response_cache.invalidate(org_id)
     db.refresh(db_team)
     return db_team
 
@@ -66,15 +130,22 @@ def update_team(db: Session, team_id: UUID, team_update: schemas.TeamUpdate):
         update_data = team_update.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_team, key, value)
+        db.flush()
+        org_id = _team_org_id(db, db_team.id)
+        bump_versions(db, org_id, HIERARCHY)
         db.commit()
+        response_cache.invalidate(org_id)
         db.refresh(db_team)
     return db_team
 
 def delete_team(db: Session, team_id: UUID):
     db_team = get_team(db, team_id)
     if db_team and not db_team.immutable:
+        org_id = _team_org_id(db, db_team.id)
         db.delete(db_team)
+        bump_versions(db, org_id, HIERARCHY)
         db.commit()
+        response_cache.invalidate(org_id)
         return db_team
     return None
 
@@ -89,18 +160,79 @@ def create_team_role(db: Session, team_role: schemas.TeamRoleCreate):
     if not data_bowl: return None
     db_team_role = models.TeamRole(**team_role.dict())
     db.add(db_team_role)
+    db.flush()
+    # The role and its DataCup land in one commit with the version bump, so no
+    # read sees the new version without the cup.
+    db.add(models.DataCup(data_bowl_id=data_bowl.id, team_role_id=db_team_role.id))
+    org_id = _team_org_id(db, team_role.team_id)
+    bump_versions(db, org_id, HIERARCHY)
     db.commit()
-    db.refresh(db_team_role)
-    create_data_cup(db, schemas.DataCupCreate(data_bowl_id=data_bowl.id, team_role_id=db_team_role.id))
+    response_cache.invalidate(org_id)
+    invalidate_access(db_team_role.user_id)
     db.refresh(db_team_role)
     return db_team_role
 
+def create_team_roles_batch(db: Session, items: List[schemas.TeamRoleCreate], org_id: int) -> List[schemas.TeamRoleBatchResult]:
+    """
+    Add many memberships in one transaction. Teams, bowls, users and existing
+    memberships are resolved with one query each, then the valid items' roles
+    and DataCups are written with multi-row INSERT ... RETURNING. Invalid items
+    are skipped and reported in their result's `error`.
+    """
+    team_ids = {item.team_id for item in items}
+    user_ids = {item.user_id for item in items}
+    bowls = dict(db.execute(
+        select(models.DataBowl.team_id, models.DataBowl.id)
+        .join(models.Team, models.DataBowl.team_id == models.Team.id)
+        .join(models.Department, models.Team.department_id == models.Department.id)
+        .where(models.DataBowl.team_id.in_(team_ids), models.Department.organization_id == org_id)
+    ).all())
+    org_users = set(db.execute(
+        select(models.User.id).where(models.User.id.in_(user_ids), models.User.organization_id == org_id)
+    ).scalars())
+    memberships = set(db.execute(
+        select(models.TeamRole.user_id, models.TeamRole.team_id)
+        .where(models.TeamRole.team_id.in_(team_ids), models.TeamRole.user_id.in_(user_ids))
+    ).tuples())
+
+    results = [schemas.TeamRoleBatchResult(index=index) for index in range(len(items))]
+    roles, cups = [], []
+    for result, item in zip(results, items):
+        membership = (item.user_id, item.team_id)
+        if item.team_id not in bowls:
+            result.error = "Team not found"
+        elif item.user_id not in org_users:
+            result.error = "User not found"
+        elif membership in memberships:
+            result.error = "User is already a member of this team"
+        else:
+            memberships.add(membership)
+            result.team_role_id, result.data_cup_id = uuid.uuid4(), uuid.uuid4()
+            roles.append({"id": result.team_role_id, "user_id": item.user_id, "team_id": item.team_id, "role": item.role})
+            cups.append({"id": result.data_cup_id, "data_bowl_id": bowls[item.team_id], "team_role_id": result.team_role_id})
+
+    if roles:
+        # An executemany INSERT ... RETURNING is sent as multi-row VALUES
+        # batches ("insertmanyvalues"), not one statement per row.
+        db.execute(insert(models.TeamRole).returning(models.TeamRole.id, sort_by_parameter_order=True), roles).all()
+        db.execute(insert(models.DataCup).returning(models.DataCup.id, sort_by_parameter_order=True), cups).all()
+        bump_versions(db, org_id, HIERARCHY)
+    db.commit()
+    if roles:
+        response_cache.invalidate(org_id)
+        for row in roles:
+            invalidate_access(row["user_id"])
+    return results
+
 def update_team_role(db: Session, team_role_id: UUID, team_role_update: schemas.TeamRoleUpdate):
     db_team_role = get_team_role(db, team_role_id)
     if db_team_role:
         if team_role_update.role is not None:
             db_team_role.role = team_role_update.role
+        org_id = _team_org_id(db, db_team_role.team_id)
+        bump_versions(db, org_id, HIERARCHY)
         db.commit()
+        response_cache.invalidate(org_id)
         db.refresh(db_team_role)
     return db_team_role
 
@@ -109,8 +241,13 @@ def delete_team_role(db: Session, team_role_id: UUID):
     if db_team_role:
         data_cup = db.query(models.DataCup).filter(models.DataCup.team_role_id == team_role_id).first()
         if data_cup: db.delete(data_cup)
+        user_id = db_team_role.user_id
         db.delete(db_team_role)
+        org_id = _team_org_id(db, db_team_role.team_id)
+        bump_versions(db, org_id, HIERARCHY)
         db.commit()
+        response_cache.invalidate(org_id)
+        invalidate_access(user_id)
     return db_team_role
 
 # ===================================================================
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
 
 from . import crud, schemas
 from ..db.session import get_db
+from ..core.responses import json_body_response
+from ..db.versions import HIERARCHY, collection_versions, not_modified, versions_etag
 from ..auth.security import get_current_user
 from .. import models
 
@@ -18,8 +20,22 @@ def create_department(department: schemas.DepartmentCreate, db: Session = Depend
     return crud.create_department(db=db, department=department, org_id=current_user.organization_id)
 
 @router.get("/departments/", response_model=List[schemas.Department], summary="Get all Departments for the organization")
-def read_departments(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    return crud.get_departments_by_org(db, org_id=current_user.organization_id)
+def read_departments(request: Request, response: Response, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    org_id = current_user.organization_id
+    versions = collection_versions(db, org_id, [HIERARCHY])
+    cached = not_modified(request, response, versions_etag(org_id, [HIERARCHY], versions))
+    if cached:
+        return cached
+    return json_body_response(crud.get_departments_by_org_json(db, org_id, version=versions[HIERARCHY]), response)
+
+@router.get("/hierarchy/", response_model=schemas.HierarchySnapshot, summary="Get the organization's full Department/Team/Role hierarchy")
+def read_hierarchy(request: Request, response: Response, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    org_id = current_user.organization_id
+    versions = collection_versions(db, org_id, [HIERARCHY])
+    cached = not_modified(request, response, versions_etag(org_id, [HIERARCHY], versions))
+    if cached:
+        return cached
+    return json_body_response(crud.get_hierarchy_snapshot_json(db, org_id, version=versions[HIERARCHY]), response)
 
 @router.get("/departments/{department_id}", response_model=schemas.Department, summary="Get a single Department by ID")
 def read_department(department_id: UUID, db: Session = Depends(get_db)):
@@ -48,8 +64,10 @@ def create_team(team: schemas.TeamCreate, db: Session = Depends(get_db)):
     return db_team
 
 @router.get("/teams/", response_model=List[schemas.Team], summary="Get all Teams in the organization")
-def read_teams(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    return crud.get_teams_by_org(db, org_id=current_user.organization_id)
+def read_teams(response: Response, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    org_id = current_user.organization_id
+    version = collection_versions(db, org_id, [HIERARCHY])[HIERARCHY]
+    return json_body_response(crud.get_teams_by_org_json(db, org_id, version=version), response)
 
 @router.get("/teams/{team_id}", response_model=schemas.Team, summary="Get a single Team by ID")
 def read_team(team_id: UUID, db: Session = Depends(get_db)):
@@ -77,6 +95,12 @@ def create_team_role(team_role: schemas.TeamRoleCreate, db: Session = Depends(ge
     if not db_role: raise HTTPException(status_code=404, detail="Team not found for this role")
     return db_role
 
+@router.post("/team_roles/batch", response_model=schemas.TeamRoleBatchResponse, summary="Assign many Users to Teams at once")
+def create_team_roles_batch(batch: schemas.TeamRoleBatchCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    results = crud.create_team_roles_batch(db, items=batch.items, org_id=current_user.organization_id)
+    failed = sum(1 for result in results if result.error)
+    return schemas.TeamRoleBatchResponse(created=len(results) - failed, failed=failed, results=results)
+
 @router.put("/team_roles/{team_role_id}", response_model=schemas.TeamRole, summary="Update a User's role in a Team")
 def update_team_role(team_role_id: UUID, team_role: schemas.TeamRoleUpdate, db: Session = Depends(get_db)):
     db_role = crud.update_team_role(db, team_role_id, team_role)
@@ -53,6 +53,20 @@ class TeamRole(TeamRoleBase):
     class Config:
         from_attributes = True
 
+class TeamRoleBatchCreate(BaseModel):
+    items: List[TeamRoleCreate] = Field(..., min_length=1, max_length=1000, description="Memberships to add, applied in one transaction")
+
+class TeamRoleBatchResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    team_role_id: Optional[UUID] = None
+    data_cup_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+class TeamRoleBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[TeamRoleBatchResult]
+
 # ===================================================================
 # DataBowl Schemas
 # ===================================================================
@@ -138,4 +152,12 @@ class Department(DepartmentBase):
     teams: List[Team] = []
     data_bucket: Optional[DataBucket] = None
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# ===================================================================
+# Hierarchy Snapshot Schemas
+# ===================================================================
+class HierarchySnapshot(BaseModel):
+    organization_id: int
+    version: int = Field(..., description="The organization's hierarchy version this snapshot was built from")
+    departments: List[Department] = []
@@ -1,9 +1,18 @@
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 from . import schemas
 from .. import models
+from ..db.pagination import paginate, split_page
+from ..db.fieldsets import load_only_fields
 from ..auth.security import get_password_hash
+from ..auth.principals import invalidate_user
+from ..core.cache import response_cache
+from ..db.versions import HIERARCHY, bump_versions
 from ..teams.crud import create_department, create_team, create_team_role
+from ..organizations.provisioning import provision_organization
+from ..teams.access import get_access_map
 from ..teams import schemas as team_schemas
 
 def get_user(db: Session, user_id: UUID):
@@ -12,76 +21,54 @@ def get_user(db: Session, user_id: UUID):
     """
     return db.query(models.User).options(joinedload(models.User.organization)).filter(models.User.id == user_id).first()
 
+async def get_user_async(db: AsyncSession, user_id: UUID):
+    """
+    Get a single user by their ID from an async session (the organization is not loaded).
+    """
+    return await db.get(models.User, user_id)
+
 def get_user_by_email(db: Session, email: str):
     """
     Get a single user by their email address, ensuring the organization is loaded.
     """
     return db.query(models.User).options(joinedload(models.User.organization)).filter(models.User.email == email).first()
 
-def get_users(db: Session, organization_id: int, skip: int = 0, limit: int = 100):
+def get_users(db: Session, organization_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None):
     """
-    Get a list of users for a specific organization, with pagination, ensuring organizations are loaded.
+    Get one page of users for a specific organization, ensuring organizations are loaded
+    (unless a fieldset leaves them out), plus the cursor of the next page.
     """
-    return db.query(models.User).options(joinedload(models.User.organization)).filter(models.User.organization_id == organization_id).offset(skip).limit(limit).all()
+    keys = [models.User.id]
+    query = db.query(models.User).filter(models.User.organization_id == organization_id)
+    if fields:
+        query = query.options(load_only_fields(models.User, fields))
+    if not fields or "organization" in fields:
+        query = query.options(joinedload(models.User.organization))
+    return split_page(paginate(query, keys, cursor=cursor, skip=skip, limit=limit).all(), keys, limit)
 
-def create_user(db: Session, user: schemas.UserCreate):
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
     """
     Create a new organization and a new user as its first member (public signup).
+    Pass `hashed_password` when the password was already hashed off-thread.
     """
-    db_org = models.Organization(name=user.organization_name)
-    db.add(db_org)
-    db.commit()
-    db.refresh(db_org)
-    # --- ADDED: Seed Default HR Structure ---
-    # Create HR Department
-    hr_dept = models.Department(name="Human Resources", organization_id=db_org.id, immutable=True)
-    db.add(hr_dept)
-    db.flush() # Generate ID
-    
-    # Create necessary DataBucket
-    hr_bucket = models.DataBucket(department_id=hr_dept.id)
-    db.add(hr_bucket)
-    db.flush()
-
-    # Create HR Team with the HR Tool enabled
-    hr_team = models.Team(
-        name="HR",
-        department_id=hr_dept.id,
-        tools=[models.Tool.HR, models.Tool.DOCS],
-        immutable=True # Enable HR tool by default
-    )
-    db.add(hr_team)
-    db.flush()
-    
-    # Create necessary DataBowl
-    hr_bowl = models.DataBowl(team_id=hr_team.id, data_bucket_id=hr_bucket.id, master_owner_team=hr_team.id)
-    db.add(hr_bowl)
-
-    hashed_password = get_password_hash(user.password)
-    
-    db_user = models.User(
-        email=user.email,
-        name=user.name,
-        hashed_password=hashed_password,
-        organization_id=db_org.id,
-        role=models.UserRole.EXECUTIVE, 
-        department=user.department,
-        title=user.title
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
-    # Reload the user with the organization relationship
-    db.refresh(db_user, attribute_names=['organization'])
-    
-    return db_user
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
+    executive = {
+        "email": user.email,
+        "name": user.name,
+        "hashed_password": hashed_password,
+        "department": user.department,
+        "title": user.title,
+    }
+    return provision_organization(db, user.organization_name, executive)
 
-def create_user_by_admin(db: Session, user: schemas.UserCreateByAdmin, organization_id: int):
+def create_user_by_admin(db: Session, user: schemas.UserCreateByAdmin, organization_id: int, hashed_password: Optional[str] = None):
     """
     Create a new user as an admin, automatically linking them to the admin's organization.
+    Pass `hashed_password` when the password was already hashed off-thread.
     """
-    hashed_password = get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
         name=user.name,
@@ -100,16 +87,21 @@ def create_user_by_admin(db: Session, user: schemas.UserCreateByAdmin, organizat
 
     return db_user
 
+def set_password_hash(db: Session, user: models.User, hashed_password: str):
+    """
+    Replace a user's stored password hash (e.g. after a rehash on login).
+    """
+    email = user.email
+    user.hashed_password = hashed_password
+    db.commit()
+    invalidate_user(email)
+    return user
+
 def get_user_datacups(db: Session, user_id: UUID):
     """
     Get all DataCup IDs associated with a user through their team roles.
     """
-    team_roles = db.query(models.TeamRole).filter(models.TeamRole.user_id == user_id).all()
-    datacup_ids = []
-    for role in team_roles:
-        if role.data_cup:
-            datacup_ids.append(role.data_cup.id)
-    return datacup_ids
+    return list(get_access_map(db, user_id).data_cups)
 
 def update_user(db: Session, user_id: UUID, user_update: schemas.UserUpdate):
     """
@@ -117,12 +109,18 @@ def update_user(db: Session, user_id: UUID, user_update: schemas.UserUpdate):
     """
     db_user = get_user(db, user_id=user_id)
     if db_user:
+        previous_email = db_user.email
         update_data = user_update.dict(exclude_unset=True)
         
         for key, value in update_data.items():
             setattr(db_user, key, value)
-            
+
+        # Team payloads embed each member's name and email.
+        bump_versions(db, db_user.organization_id, HIERARCHY)
         db.commit()
+        invalidate_user(previous_email)
+        invalidate_user(update_data.get("email"))
+        response_cache.invalidate(db_user.organization_id)
         db.refresh(db_user)
         # Reload the user with the organization relationship after update
         db.refresh(db_user, attribute_names=['organization'])
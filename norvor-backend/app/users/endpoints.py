@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from . import crud, schemas
-from ..db.session import get_db
+from . import crud, imports, schemas
+from ..core.config import settings
+from ..db.session import get_db, get_read_db
+from ..db.pagination import set_next_cursor
+from ..db.fieldsets import parse_fields, sparse_response
 from ..auth.security import get_current_user
+from ..auth import hashing
 from .. import models
 
 router = APIRouter()
@@ -18,17 +23,18 @@ def read_users_me(current_user: schemas.User = Depends(get_current_user)):
     return current_user
 
 @router.post("/", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """
     Create a new user and organization.
     """
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await run_in_threadpool(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db=db, user=user)
+    hashed_password = await hashing.hash_password(user.password)
+    return await run_in_threadpool(crud.create_user, db=db, user=user, hashed_password=hashed_password)
 
 @router.post("/create_by_admin", response_model=schemas.User)
-def create_user_by_admin(
+async def create_user_by_admin(
     user: schemas.UserCreateByAdmin, 
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(get_current_user)
@@ -39,34 +45,97 @@ def create_user_by_admin(
     if current_user.role != models.UserRole.EXECUTIVE:
         raise HTTPException(status_code=403, detail="Not authorized to create users")
         
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await run_in_threadpool(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
         
-    return crud.create_user_by_admin(db=db, user=user, organization_id=current_user.organization_id)
+    hashed_password = await hashing.hash_password(user.password)
+    return await run_in_threadpool(
+        crud.create_user_by_admin,
+        db=db,
+        user=user,
+        organization_id=current_user.organization_id,
+        hashed_password=hashed_password,
+    )
+
+def _require_executive(current_user: models.User):
+    if current_user.role != models.UserRole.EXECUTIVE:
+        raise HTTPException(status_code=403, detail="Not authorized to create users")
+
+@router.post("/import", response_model=schemas.UserImportJob, status_code=status.HTTP_202_ACCEPTED)
+def import_users(
+    batch: schemas.UserImportCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Start a background import of many users into the current admin's organization.
+    Poll the returned job for progress.
+    """
+    _require_executive(current_user)
+    if len(batch.users) > settings.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"Imports are limited to {settings.USER_IMPORT_MAX_ROWS} rows")
+    job = imports.create_job(db, current_user.organization_id, current_user.id, total=len(batch.users), errors=[])
+    background_tasks.add_task(imports.run_import, job.id, batch.users)
+    return job
+
+@router.post("/import/csv", response_model=schemas.UserImportJob, status_code=status.HTTP_202_ACCEPTED)
+def import_users_csv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="CSV with a header row: name,email,password[,role,department,title,team_id,team_role]"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Start a background import of users from a CSV upload. Rows that fail
+    validation are reported in the job's errors; the rest are imported.
+    """
+    _require_executive(current_user)
+    items, errors = imports.parse_csv(file.file)
+    job = imports.create_job(db, current_user.organization_id, current_user.id, total=len(items), errors=errors)
+    background_tasks.add_task(imports.run_import, job.id, items)
+    return job
+
+@router.get("/import/{job_id}", response_model=schemas.UserImportJob)
+def read_import_job(job_id: UUID, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """
+    Progress and per-row errors of a bulk import.
+    """
+    job = imports.get_job(db, job_id, current_user.organization_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
 # --- MODIFY THIS ENDPOINT ---
 # In read_users endpoint:
 @router.get("/", response_model=List[schemas.User])
 def read_users(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    users = crud.get_users(db, organization_id=current_user.organization_id, skip=skip, limit=limit)
+    selected = parse_fields(fields, schemas.User)
+    users, next_cursor = crud.get_users(db, organization_id=current_user.organization_id, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    set_next_cursor(response, next_cursor)
+    if selected:
+        return sparse_response(users, schemas.User, selected, response)
     return users
 # ---------------------------
 
 @router.get("/me/datacups", response_model=List[UUID])
-def read_my_datacups(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def read_my_datacups(db: Session = Depends(get_read_db), current_user: models.User = Depends(get_current_user)):
     """
     Get the DataCup IDs for the currently logged-in user.
     """
     return crud.get_user_datacups(db, user_id=current_user.id)
 
 @router.get("/{user_id}", response_model=schemas.User)
-def read_user(user_id: UUID, db: Session = Depends(get_db)):
+def read_user(user_id: UUID, db: Session = Depends(get_read_db)):
     """
     Retrieve a single user by ID.
     """
@@ -0,0 +1,158 @@
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import BinaryIO, List, Tuple
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from . import schemas
+from .. import models
+from ..auth import hashing
+from ..core.config import settings
+from ..db.session import SessionLocal
+from ..teams import schemas as team_schemas
+from ..teams.crud import create_team_roles_batch
+
+logger = logging.getLogger(__name__)
+
+# --- Bulk User Import ---
+# An import is accepted as a job row and processed after the response is sent,
+# USER_IMPORT_BATCH_SIZE users at a time. Each batch checks its emails against
+# the table with one query, hashes the remaining passwords in parallel on the
+# bulk hashing pool, inserts the users as one multi-row INSERT and adds any
+# team memberships, then commits together with the job's progress counters.
+
+
+def parse_csv(file: BinaryIO) -> Tuple[List[schemas.UserImportItem], List[dict]]:
+    """
+    Read an uploaded CSV (header row with UserImportItem field names) row by
+    row. Returns one item per row (None where the row was invalid) and an
+    error entry for every invalid row.
+    """
+    items, errors = [], []
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    for row_number, row in enumerate(reader, start=1):
+        if row_number > settings.USER_IMPORT_MAX_ROWS:
+            raise HTTPException(status_code=400, detail=f"Imports are limited to {settings.USER_IMPORT_MAX_ROWS} rows")
+        values = {key: value for key, value in row.items() if key and value not in (None, "")}
+        try:
+            items.append(schemas.UserImportItem(**values))
+        except ValidationError as exc:
+            problems = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+            errors.append({"row": row_number, "email": row.get("email"), "error": problems})
+            items.append(None)
+    return items, errors
+
+
+def create_job(db: Session, organization_id: int, created_by: UUID, total: int, errors: List[dict]) -> models.UserImportJob:
+    db_job = models.UserImportJob(
+        organization_id=organization_id,
+        created_by=created_by,
+        total=total,
+        processed=len(errors),
+        failed=len(errors),
+        errors=errors,
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+def get_job(db: Session, job_id: UUID, organization_id: int):
+    return db.query(models.UserImportJob).filter(
+        models.UserImportJob.id == job_id, models.UserImportJob.organization_id == organization_id
+    ).first()
+
+
+def _import_batch(db: Session, organization_id: int, batch: List[Tuple[int, schemas.UserImportItem]], seen: set) -> Tuple[int, List[dict]]:
+    errors = []
+    emails = [item.email for _, item in batch]
+    existing = set(db.execute(select(models.User.email).where(models.User.email.in_(emails))).scalars())
+    accepted = []
+    for row_number, item in batch:
+        if item.email in existing:
+            errors.append({"row": row_number, "email": item.email, "error": "Email already registered"})
+        elif item.email in seen:
+            errors.append({"row": row_number, "email": item.email, "error": "Duplicate email in this import"})
+        else:
+            seen.add(item.email)
+            accepted.append((row_number, item))
+    if not accepted:
+        return 0, errors
+
+    hashes = hashing.hash_passwords([item.password for _, item in accepted])
+    users = [
+        {
+            "id": uuid4(),
+            "email": item.email,
+            "name": item.name,
+            "hashed_password": hashed_password,
+            "organization_id": organization_id,
+            "role": item.role,
+            "department": item.department,
+            "title": item.title,
+        }
+        for (_, item), hashed_password in zip(accepted, hashes)
+    ]
+    # ON CONFLICT covers emails registered since the check above; those rows
+    # are simply not returned.
+    statement = insert(models.User).values(users).on_conflict_do_nothing(index_elements=[models.User.email])
+    created_ids = set(db.execute(statement.returning(models.User.id)).scalars())
+
+    memberships = []
+    for (row_number, item), user in zip(accepted, users):
+        if user["id"] not in created_ids:
+            errors.append({"row": row_number, "email": item.email, "error": "Email already registered"})
+        elif item.team_id is not None:
+            memberships.append((row_number, item, team_schemas.TeamRoleCreate(user_id=user["id"], team_id=item.team_id, role=item.team_role)))
+    if memberships:
+        # Commits the users together with their roles and DataCups.
+        results = create_team_roles_batch(db, [membership for _, _, membership in memberships], organization_id)
+        for (row_number, item, _), result in zip(memberships, results):
+            if result.error:
+                errors.append({"row": row_number, "email": item.email, "error": f"User created, but not added to team: {result.error}"})
+    return len(created_ids), errors
+
+
+def run_import(job_id: UUID, items: List[schemas.UserImportItem]):
+    """
+    Process an import job in the background. `items` holds one entry per
+    uploaded row; rows already rejected at upload are None.
+    """
+    db = SessionLocal()
+    try:
+        db_job = db.get(models.UserImportJob, job_id)
+        organization_id = db_job.organization_id
+        db_job.status = models.ImportStatus.RUNNING
+        db.commit()
+        rows = [(row_number, item) for row_number, item in enumerate(items, start=1) if item is not None]
+        seen = set()
+        for start in range(0, len(rows), settings.USER_IMPORT_BATCH_SIZE):
+            batch = rows[start:start + settings.USER_IMPORT_BATCH_SIZE]
+            created, errors = _import_batch(db, organization_id, batch, seen)
+            db_job.processed += len(batch)
+            db_job.created += created
+            db_job.failed += len(batch) - created
+            db_job.errors = db_job.errors + errors
+            db.commit()
+        db_job.status = models.ImportStatus.COMPLETED
+        db_job.finished_at = datetime.utcnow()
+        db.commit()
+    except Exception:
+        logger.exception("User import %s failed", job_id)
+        db.rollback()
+        db_job = db.get(models.UserImportJob, job_id)
+        if db_job is not None:
+            db_job.status = models.ImportStatus.FAILED
+            db_job.finished_at = datetime.utcnow()
+            db_job.errors = db_job.errors + [{"row": None, "email": None, "error": "Import stopped by an internal error"}]
+            db.commit()
+    finally:
+        db.close()
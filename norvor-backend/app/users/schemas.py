@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 from uuid import UUID
-from ..models import UserRole
+from ..models import ImportStatus, UserRole
 from ..organizations.schemas import OrganizationInUser
 
 # --- Properties to receive via API on public creation ---
@@ -51,4 +52,37 @@ class User(BaseModel):
     title: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- Bulk Import Schemas ---
+class UserImportItem(BaseModel):
+    name: str
+    email: EmailStr
+    password: str
+    role: UserRole = UserRole.TEAM
+    department: str = "General"
+    title: Optional[str] = None
+    team_id: Optional[UUID] = Field(None, description="Team to add the user to once created")
+    team_role: str = "Member"
+
+class UserImportCreate(BaseModel):
+    users: List[UserImportItem] = Field(..., min_length=1)
+
+class UserImportError(BaseModel):
+    row: Optional[int] = Field(None, description="1-based position of the row in the upload")
+    email: Optional[str] = None
+    error: str
+
+class UserImportJob(BaseModel):
+    id: UUID
+    status: ImportStatus
+    total: int
+    processed: int
+    created: int
+    failed: int
+    errors: List[UserImportError] = []
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
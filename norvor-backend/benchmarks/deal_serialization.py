@@ -0,0 +1,136 @@
+"""
+Serialization cost of a large `crm/deals/` page: ORM + response_model vs. Core rows + orjson.
+
+Loads --rows deals for one organization into the database at --url (an
+in-memory SQLite database by default, so it runs anywhere) and times the
+query-to-bytes path of each strategy, reporting median latency and peak
+traced memory:
+
+    python benchmarks/deal_serialization.py --rows 10000
+    python benchmarks/deal_serialization.py --url postgresql+psycopg2://... --schema norvor_bench
+
+  orm+pydantic   ORM entities through the identity map, validated by the
+                 response model and dumped to JSON by Pydantic (FastAPI's path)
+  orm+encoder    the same, via jsonable_encoder and the stdlib json module
+                 (FastAPI's path for endpoints without a response model)
+  core+orjson    Core rows of the schema's columns encoded by FastJSONResponse
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import List
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import Response  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert, select, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import models  # noqa: E402
+from app.crm import schemas  # noqa: E402
+from app.core.responses import orjson  # noqa: E402
+from app.db.fieldsets import row_columns, rows_response  # noqa: E402
+
+ORGANIZATION_ID = 1
+deals_adapter = TypeAdapter(List[schemas.Deal])
+
+
+def orm_pydantic(engine):
+    with Session(engine) as db:
+        deals = db.execute(select(models.Deal).where(models.Deal.organization_id == ORGANIZATION_ID)).scalars().all()
+        return deals_adapter.dump_json(deals_adapter.validate_python(deals, from_attributes=True))
+
+
+def orm_encoder(engine):
+    with Session(engine) as db:
+        deals = db.execute(select(models.Deal).where(models.Deal.organization_id == ORGANIZATION_ID)).scalars().all()
+        payload = [schemas.Deal.model_validate(deal) for deal in deals]
+        return json.dumps(jsonable_encoder(payload)).encode("utf-8")
+
+
+def core_orjson(engine):
+    with Session(engine) as db:
+        query = select(*row_columns(models.Deal, schemas.Deal)).where(models.Deal.organization_id == ORGANIZATION_ID)
+        rows = db.execute(query).all()
+        return rows_response(rows, schemas.Deal, None, Response()).body
+
+
+STRATEGIES = {"orm+pydantic": orm_pydantic, "orm+encoder": orm_encoder, "core+orjson": core_orjson}
+
+
+def seed(engine, rows):
+    tables = [models.Deal.__table__]
+    models.Base.metadata.drop_all(engine, tables=tables)
+    models.Base.metadata.create_all(engine, tables=tables)
+    stages = list(models.DealStage)
+    today = datetime.date.today()
+    with engine.begin() as connection:
+        connection.execute(insert(models.Deal), [
+            {
+                "name": f"Deal {i}",
+                "value": float(i % 1000) * 10,
+                "stage": stages[i % len(stages)],
+                "contact_id": i,
+                "company_id": i % 50,
+                "owner_id": uuid.uuid4(),
+                "organization_id": ORGANIZATION_ID,
+                "close_date": today + datetime.timedelta(days=i % 365),
+                "data_cup_id": uuid.uuid4(),
+            }
+            for i in range(1, rows + 1)
+        ])
+
+
+def measure(function, engine, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = function(engine)
+        timings.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    function(engine)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / (1024 * 1024), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite://", help="SQLAlchemy URL (default: in-memory SQLite)")
+    parser.add_argument("--schema", help="Postgres schema to create the deals table in (dropped first)")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    options = {}
+    if args.schema:
+        options["connect_args"] = {"options": f"-csearch_path={args.schema}"}
+    engine = create_engine(args.url, **options)
+    if args.schema:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+            connection.execute(text(f"CREATE SCHEMA {args.schema}"))
+    seed(engine, args.rows)
+
+    if orjson is None:
+        print("orjson is not installed; core+orjson falls back to the stdlib encoder")
+    print(f"{'strategy':<14} {'median ms':>10} {'peak MiB':>9} {'bytes':>10}")
+    for label, function in STRATEGIES.items():
+        median, peak, size = measure(function, engine, args.repeat)
+        print(f"{label:<14} {median:>10.1f} {peak:>9.1f} {size:>10}")
+
+
+if __name__ == "__main__":
+    main()
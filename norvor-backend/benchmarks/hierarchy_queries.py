@@ -0,0 +1,128 @@
+"""
+Queries and latency to serialize an organization's department hierarchy as the
+number of teams grows: the old joinedload(teams, data_bucket) loading vs. the
+selectinload chains behind `GET /teams/hierarchy/` and `GET /teams/departments/`.
+
+Seeds one organization per --teams value into the database at --url (an
+in-memory SQLite database by default, so it runs anywhere) and prints the
+statement count and median time of each strategy:
+
+    python benchmarks/hierarchy_queries.py --teams 5 20 80 --members 8
+    python benchmarks/hierarchy_queries.py --url postgresql+psycopg2://... --schema norvor_bench
+
+  joinedload   teams and data bucket joined in; roles, users, cups and bowls
+               lazy-load one by one during serialization
+  selectin     one SELECT ... IN per relationship level (per 500 parent rows)
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import JSON, create_engine, event, insert, text  # noqa: E402
+from sqlalchemy.orm import Session, joinedload  # noqa: E402
+
+from app import models  # noqa: E402
+from app.teams import crud, schemas  # noqa: E402
+
+departments_adapter = TypeAdapter(List[schemas.Department])
+TABLES = [
+    models.Organization.__table__, models.User.__table__, models.Department.__table__,
+    models.DataBucket.__table__, models.Team.__table__, models.DataBowl.__table__,
+    models.TeamRole.__table__, models.DataCup.__table__,
+]
+
+
+def joinedload_departments(db, org_id):
+    return db.query(models.Department).filter(models.Department.organization_id == org_id).options(
+        joinedload(models.Department.teams), joinedload(models.Department.data_bucket)
+    ).all()
+
+
+STRATEGIES = {"joinedload": joinedload_departments, "selectin": crud.get_departments_by_org}
+
+
+def seed(engine, org_id, teams, members, departments):
+    rows = {table.name: [] for table in TABLES}
+    rows["organizations"].append({"id": org_id, "name": f"Org {org_id}", "has_completed_onboarding": True})
+    for d in range(departments):
+        department_id, bucket_id = uuid.uuid4(), uuid.uuid4()
+        rows["departments"].append({"id": department_id, "name": f"Department {d}", "organization_id": org_id, "immutable": False})
+        rows["data_buckets"].append({"id": bucket_id, "department_id": department_id})
+        for t in range(d, teams, departments):
+            team_id, bowl_id = uuid.uuid4(), uuid.uuid4()
+            rows["teams"].append({"id": team_id, "name": f"Team {t}", "department_id": department_id, "immutable": False, "active": True, "tools": []})
+            rows["data_bowls"].append({"id": bowl_id, "team_id": team_id, "data_bucket_id": bucket_id, "master_owner_team": team_id})
+            for m in range(members):
+                user_id, role_id = uuid.uuid4(), uuid.uuid4()
+                rows["users"].append({"id": user_id, "name": f"User {t}.{m}", "email": f"{org_id}.{t}.{m}@bench.test", "organization_id": org_id, "role": models.UserRole.TEAM})
+                rows["team_roles"].append({"id": role_id, "user_id": user_id, "team_id": team_id, "role": "Member"})
+                rows["data_cups"].append({"id": uuid.uuid4(), "data_bowl_id": bowl_id, "team_role_id": role_id})
+    with engine.begin() as connection:
+        for table in TABLES:
+            if rows[table.name]:
+                connection.execute(insert(table), rows[table.name])
+
+
+def measure(engine, load, org_id, repeat):
+    statements = []
+    counter = lambda *args: statements.append(1)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", counter)
+    timings, queries = [], 0
+    try:
+        for _ in range(repeat):
+            statements.clear()
+            started = time.perf_counter()
+            with Session(engine) as db:
+                departments_adapter.dump_json(departments_adapter.validate_python(load(db, org_id), from_attributes=True))
+            timings.append((time.perf_counter() - started) * 1000)
+            queries = len(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    return queries, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite://", help="SQLAlchemy URL (default: in-memory SQLite)")
+    parser.add_argument("--schema", help="Postgres schema to create the tables in (dropped first)")
+    parser.add_argument("--teams", type=int, nargs="+", default=[5, 20, 80])
+    parser.add_argument("--members", type=int, default=8, help="members per team")
+    parser.add_argument("--departments", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    options = {}
+    if args.schema:
+        options["connect_args"] = {"options": f"-csearch_path={args.schema}"}
+    engine = create_engine(args.url, **options)
+    if engine.dialect.name != "postgresql":
+        # teams.tools is a Postgres ARRAY; store it as JSON elsewhere.
+        models.Team.__table__.c.tools.type = JSON()
+    if args.schema:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+            connection.execute(text(f"CREATE SCHEMA {args.schema}"))
+    models.Base.metadata.drop_all(engine, tables=TABLES)
+    models.Base.metadata.create_all(engine, tables=TABLES)
+
+    print(f"{'teams':>6} {'strategy':<11} {'queries':>8} {'median ms':>10}")
+    for org_id, teams in enumerate(args.teams, start=1):
+        seed(engine, org_id, teams, args.members, args.departments)
+        for label, load in STRATEGIES.items():
+            queries, median = measure(engine, load, org_id, args.repeat)
+            print(f"{teams:>6} {label:<11} {queries:>8} {median:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Before/after plans and latency for the org-scoped list queries.
+
+Builds a synthetic dataset in a throwaway schema (default `norvor_bench`) of
+the database at --url, runs the hot list queries without the indexes from
+migration 8f041e6cefd7, then again with them, and prints plan shapes and
+median latency side by side:
+
+    python benchmarks/list_query_plans.py --url postgresql+psycopg2://... --rows 500000
+
+The schema is dropped and recreated on every run; nothing outside it is touched.
+"""
+import argparse
+import importlib.util
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+
+from app.db.base import Base  # noqa: E402
+
+
+def load_migration_indexes():
+    path = next((project_root / "alembic" / "versions").glob("8f041e6cefd7_*.py"))
+    spec = importlib.util.spec_from_file_location("list_index_migration", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.INDEXES
+
+
+SEED_SQL = """
+INSERT INTO organizations (name, has_completed_onboarding)
+SELECT 'Org ' || g, true FROM generate_series(1, :orgs) g;
+
+INSERT INTO users (id, name, email, organization_id, role)
+SELECT gen_random_uuid(), 'User ' || g, 'user' || g || '@bench.test',
+       1 + (g % :orgs), 'TEAM'
+FROM generate_series(1, :orgs * :users_per_org) g;
+
+INSERT INTO departments (id, name, organization_id, immutable)
+SELECT gen_random_uuid(), 'Dept', id, false FROM organizations;
+INSERT INTO data_buckets (id, department_id) SELECT gen_random_uuid(), id FROM departments;
+INSERT INTO teams (id, name, department_id, immutable, active)
+SELECT gen_random_uuid(), 'Team', id, false, true FROM departments;
+INSERT INTO data_bowls (id, team_id, data_bucket_id, master_owner_team)
+SELECT gen_random_uuid(), t.id, b.id, t.id FROM teams t JOIN data_buckets b ON b.department_id = t.department_id;
+INSERT INTO team_roles (id, user_id, team_id, role)
+SELECT gen_random_uuid(), u.id, t.id, 'Member'
+FROM users u JOIN departments d ON d.organization_id = u.organization_id JOIN teams t ON t.department_id = d.id;
+INSERT INTO data_cups (id, data_bowl_id, team_role_id)
+SELECT gen_random_uuid(), bw.id, tr.id FROM team_roles tr JOIN data_bowls bw ON bw.team_id = tr.team_id;
+
+CREATE TEMP TABLE bench_users AS
+SELECT u.id, u.organization_id, dc.id AS data_cup_id, row_number() OVER (ORDER BY random()) AS rn
+FROM users u JOIN team_roles tr ON tr.user_id = u.id JOIN data_cups dc ON dc.team_role_id = tr.id;
+
+INSERT INTO contacts (name, email, owner_id, created_at, data_cup_id)
+SELECT 'Contact ' || g, 'c' || g || '@bench.test', u.id, current_date, u.data_cup_id
+FROM generate_series(1, :rows) g JOIN bench_users u ON u.rn = 1 + (g % (:orgs * :users_per_org));
+
+INSERT INTO deals (name, value, stage, contact_id, owner_id, close_date, data_cup_id)
+SELECT 'Deal ' || g, (g % 1000) * 10, 'NEW_LEAD', 1 + (g % :rows), u.id, current_date + (g % 365), u.data_cup_id
+FROM generate_series(1, :rows) g JOIN bench_users u ON u.rn = 1 + ((g * 7) % (:orgs * :users_per_org));
+
+INSERT INTO activities (type, notes, date, contact_id, user_id)
+SELECT 'CALL', 'note', current_date, 1 + (g % :rows), u.id
+FROM generate_series(1, :rows) g JOIN bench_users u ON u.rn = 1 + ((g * 11) % (:orgs * :users_per_org));
+
+INSERT INTO projects (name, manager_id, status, progress, start_date, end_date, data_cup_id)
+SELECT 'Project ' || u.rn, u.id, 'ON_TRACK', 0, current_date, current_date + 30, u.data_cup_id FROM bench_users u;
+
+INSERT INTO tasks (name, status, assignee_id, project_id, due_date)
+SELECT 'Task ' || g, 'TO_DO', u.id, u.rn, current_date
+FROM generate_series(1, :rows) g JOIN bench_users u ON u.rn = 1 + ((g * 13) % (:orgs * :users_per_org));
+
+INSERT INTO tickets (title, status, submitted_by, team_id, created_at)
+SELECT 'Ticket ' || g, 'OPEN', u.id, 'team-' || u.organization_id, now()
+FROM generate_series(1, :rows) g JOIN bench_users u ON u.rn = 1 + ((g * 17) % (:orgs * :users_per_org));
+
+INSERT INTO docs (id, organization_id, title, content, data_cup_id)
+SELECT 'doc_' || g, u.organization_id, 'Doc ' || g, repeat('x', 200), u.data_cup_id
+FROM generate_series(1, :rows) g JOIN bench_users u ON u.rn = 1 + ((g * 19) % (:orgs * :users_per_org));
+"""
+
+# Same shapes as the CRUD list queries; :org and :uid are bound per run.
+QUERIES = {
+    "users (org)": "SELECT * FROM users WHERE organization_id = :org LIMIT 100",
+    "contacts (org)": "SELECT contacts.* FROM contacts JOIN users ON contacts.owner_id = users.id WHERE users.organization_id = :org LIMIT 100 OFFSET 1000",
+    "deals (org)": "SELECT deals.* FROM deals JOIN users ON deals.owner_id = users.id WHERE users.organization_id = :org LIMIT 100 OFFSET 1000",
+    "activities (org)": "SELECT activities.* FROM activities JOIN users ON activities.user_id = users.id WHERE users.organization_id = :org LIMIT 100 OFFSET 1000",
+    "tasks (org)": "SELECT tasks.* FROM tasks JOIN users ON tasks.assignee_id = users.id WHERE users.organization_id = :org LIMIT 100 OFFSET 1000",
+    "tickets (team)": "SELECT * FROM tickets WHERE team_id = 'team-' || :org LIMIT 100",
+    "docs (org)": "SELECT * FROM docs WHERE organization_id = :org LIMIT 100 OFFSET 1000",
+    "my_deals (user)": "SELECT deals.* FROM deals JOIN data_cups ON data_cups.id = deals.data_cup_id JOIN team_roles ON team_roles.id = data_cups.team_role_id WHERE team_roles.user_id = :uid",
+    "my_docs (user)": "SELECT docs.* FROM docs JOIN data_cups ON data_cups.id = docs.data_cup_id JOIN team_roles ON team_roles.id = data_cups.team_role_id WHERE team_roles.user_id = :uid",
+}
+
+
+def plan_nodes(plan):
+    nodes = [plan["Node Type"] + (f" on {plan['Relation Name']}" if "Relation Name" in plan else "")]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def measure(connection, params, repeat):
+    results = {}
+    for label, sql in QUERIES.items():
+        explain = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()
+        scans = [node for node in plan_nodes(explain[0]["Plan"]) if "Scan" in node]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            connection.execute(text(sql), params).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[label] = (statistics.median(timings), ", ".join(scans))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="SQLAlchemy URL of a Postgres database to benchmark in")
+    parser.add_argument("--schema", default="norvor_bench")
+    parser.add_argument("--orgs", type=int, default=20)
+    parser.add_argument("--users-per-org", type=int, default=250)
+    parser.add_argument("--rows", type=int, default=200000, help="rows per list table")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, connect_args={"options": f"-csearch_path={args.schema}"})
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {args.schema}"))
+    Base.metadata.create_all(engine)
+
+    indexes = load_migration_indexes()
+    with engine.begin() as connection:
+        for name, _, _ in indexes:
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        print(f"Seeding {args.rows} rows per table...")
+        started = time.perf_counter()
+        params = {"orgs": args.orgs, "users_per_org": args.users_per_org, "rows": args.rows}
+        for statement in SEED_SQL.split(";"):
+            if statement.strip():
+                connection.execute(text(statement), params)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+    with engine.connect() as connection:
+        connection.execute(text("ANALYZE"))
+        org = args.orgs // 2 or 1
+        uid = connection.execute(text("SELECT id FROM users WHERE organization_id = :org LIMIT 1"), {"org": org}).scalar()
+        params = {"org": org, "uid": uid}
+        before = measure(connection, params, args.repeat)
+
+    with engine.begin() as connection:
+        for name, table, columns in indexes:
+            connection.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+        connection.execute(text("ANALYZE"))
+
+    with engine.connect() as connection:
+        after = measure(connection, params, args.repeat)
+
+    print(f"\n{'query':<20} {'before ms':>10} {'after ms':>10} {'speedup':>8}  plan after")
+    for label in QUERIES:
+        b, _ = before[label]
+        a, plan = after[label]
+        print(f"{label:<20} {b:>10.2f} {a:>10.2f} {b / a if a else 0:>7.1f}x  {plan}")
+        print(f"{'':<20} {'':>10} {'':>10} {'':>8}  plan before: {before[label][1]}")
+
+
+if __name__ == "__main__":
+    main()
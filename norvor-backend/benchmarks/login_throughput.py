@@ -0,0 +1,101 @@
+"""
+Login throughput vs. concurrent read latency.
+
+Measures p50/p95/p99 latency of an authenticated GET while idle, then again
+while a configurable number of clients hammer /login. Run against a live
+server (e.g. `uvicorn app.main:app`) seeded with the given credentials:
+
+    python benchmarks/login_throughput.py --email a@b.com --password secret
+
+Requires httpx (`pip install httpx`).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - benchmark-only dependency
+    raise SystemExit("This benchmark needs httpx: pip install httpx")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login(client, email, password):
+    return await client.post("/api/v1/login", data={"username": email, "password": password})
+
+
+async def reader(client, token, stop, latencies):
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/api/v1/users/me", headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def login_storm(client, email, password, stop, outcomes):
+    while not stop.is_set():
+        response = await login(client, email, password)
+        outcomes[response.status_code] = outcomes.get(response.status_code, 0) + 1
+
+
+async def run_phase(client, token, args, with_logins):
+    stop = asyncio.Event()
+    latencies, outcomes = [], {}
+    tasks = [asyncio.create_task(reader(client, token, stop, latencies)) for _ in range(args.readers)]
+    if with_logins:
+        tasks += [
+            asyncio.create_task(login_storm(client, args.email, args.password, stop, outcomes))
+            for _ in range(args.login_clients)
+        ]
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return latencies, outcomes
+
+
+def report(label, latencies, outcomes, duration):
+    print(f"\n== {label} ==")
+    print(f"reads: {len(latencies)}  ({len(latencies) / duration:.1f}/s)")
+    if latencies:
+        print(
+            f"read latency ms: p50={statistics.median(latencies):.1f} "
+            f"p95={percentile(latencies, 95):.1f} p99={percentile(latencies, 99):.1f}"
+        )
+    if outcomes:
+        ok = outcomes.get(200, 0)
+        print(f"logins: {ok / duration:.1f}/s ok, status counts: {dict(sorted(outcomes.items()))}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--login-clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.readers + args.login_clients + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        response = await login(client, args.email, args.password)
+        response.raise_for_status()
+        token = response.json()["access_token"]
+
+        latencies, outcomes = await run_phase(client, token, args, with_logins=False)
+        report("reads only", latencies, outcomes, args.duration)
+
+        latencies, outcomes = await run_phase(client, token, args, with_logins=True)
+        report(f"reads + {args.login_clients} login clients", latencies, outcomes, args.duration)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
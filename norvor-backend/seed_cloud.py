@@ -123,6 +123,7 @@ def seed_organization(db: Session, org_name: str, user_data: list, company_data:
             email=ct_data["email"],
             company_id=companies[ct_data["company_id"]].id,
             owner_id=owner_role["role"].user_id,
+            organization_id=org_id,
             data_cup_id=owner_role["cup"].id,
             created_at=date.today()
         )
@@ -141,6 +142,7 @@ def seed_organization(db: Session, org_name: str, user_data: list, company_data:
             company_id=companies[d_data["company_id"]].id,
             contact_id=contacts[d_data["contact_id"]].id,
             owner_id=owner_role["role"].user_id,
+            organization_id=org_id,
             data_cup_id=owner_role["cup"].id,
             close_date=date.today() + timedelta(days=30)
         )